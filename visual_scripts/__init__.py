@@ -0,0 +1,4 @@
+"""Scripts that render the figures and videos for the VLA-0 webpage.
+
+Run them through ``python -m visual_scripts``; see ``__main__.py``.
+"""
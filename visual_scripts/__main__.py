@@ -0,0 +1,90 @@
+"""Single entry point for the visual scripts
+
+    python -m visual_scripts render plots [create_libero_plot.py options]
+    python -m visual_scripts render animation [create_libero_animation.py options]
+    python -m visual_scripts render assets [web_assets.py options]
+    python -m visual_scripts build [site_build.py options]
+    python -m visual_scripts bench [benchmark.py options]
+    python -m visual_scripts watch [watch.py options]
+    python -m visual_scripts serve [chart_service.py options]
+    python -m visual_scripts fonts [--refresh]
+
+Rendering is forced onto the headless Agg backend, and each subcommand only
+imports the script it runs, so short jobs don't pay for the others.
+"""
+import argparse
+import importlib
+import os
+import sys
+
+# Script name per render target, imported only when that target is rendered
+TARGETS = {
+    'plots': 'create_libero_plot',
+    'animation': 'create_libero_animation',
+    'assets': 'web_assets',
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m visual_scripts',
+                                     description="Render the VLA-0 webpage visuals")
+    commands = parser.add_subparsers(dest='command', required=True)
+    render = commands.add_parser('render', help="Render plots, the animation or the web assets")
+    render.add_argument('target', choices=TARGETS)
+    render.add_argument('options', nargs=argparse.REMAINDER,
+                        help="Passed on to the script (see 'render TARGET --help')")
+    build = commands.add_parser('build', help="Build every site asset in parallel, skipping "
+                                              "up-to-date ones", prefix_chars='+', add_help=False)
+    build.add_argument('options', nargs=argparse.REMAINDER,
+                       help="Passed on to site_build.py (see 'build --help')")
+    # Options all go to benchmark.py, including --help
+    bench = commands.add_parser('bench', help="Run the benchmarks and compare to the baseline",
+                                prefix_chars='+', add_help=False)
+    bench.add_argument('options', nargs=argparse.REMAINDER,
+                       help="Passed on to benchmark.py (see 'bench --help')")
+    watch = commands.add_parser('watch', help="Re-render whenever the code, style or data change",
+                                prefix_chars='+', add_help=False)
+    watch.add_argument('options', nargs=argparse.REMAINDER,
+                       help="Passed on to watch.py (see 'watch --help')")
+    serve = commands.add_parser('serve', help="Serve rendered charts over HTTP",
+                                prefix_chars='+', add_help=False)
+    serve.add_argument('options', nargs=argparse.REMAINDER,
+                       help="Passed on to chart_service.py (see 'serve --help')")
+    fonts = commands.add_parser('fonts', help="Show the saved font choice")
+    fonts.add_argument('--refresh', action='store_true',
+                       help="Search the installed fonts again (e.g. after installing Helvetica)")
+    args = parser.parse_args(argv)
+
+    # Before anything imports pyplot, so no GUI toolkit is ever loaded
+    os.environ['MPLBACKEND'] = 'Agg'
+    # The scripts import their helpers as top-level modules
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    if args.command == 'fonts':
+        import plot_style
+        family = plot_style.resolve_font(refresh=args.refresh)
+        print(f"{family} (saved in {plot_style.FONT_CHOICE_PATH})")
+    elif args.command == 'build':
+        import site_build
+        sys.argv[0] = f'{parser.prog} build'
+        site_build.main(args.options)
+    elif args.command == 'bench':
+        import benchmark
+        sys.argv[0] = f'{parser.prog} bench'
+        benchmark.main(args.options)
+    elif args.command == 'watch':
+        import watch
+        sys.argv[0] = f'{parser.prog} watch'
+        watch.main(args.options)
+    elif args.command == 'serve':
+        import chart_service
+        sys.argv[0] = f'{parser.prog} serve'
+        chart_service.main(args.options)
+    else:
+        script = importlib.import_module(TARGETS[args.target])
+        sys.argv[0] = f'{parser.prog} render {args.target}'  # For the script's --help
+        script.main(args.options)
+
+
+if __name__ == "__main__":
+    main()
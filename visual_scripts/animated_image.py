@@ -0,0 +1,229 @@
+import os
+
+import numpy as np
+from PIL import GifImagePlugin, Image
+
+from video_writer import RawVideoWriter, temporary_path
+
+# GIF palette entries; one more index is kept for transparency
+PALETTE_COLORS = 255
+TRANSPARENT = 255
+
+
+def unpack(packed):
+    """0xRRGGBB integers -> (n, 3) colors"""
+    return np.stack([packed >> 16, (packed >> 8) & 0xFF, packed & 0xFF], axis=-1)
+
+
+def pack(rgb):
+    rgb = rgb.astype(np.uint32)
+    return (rgb[..., 0] << 16) | (rgb[..., 1] << 8) | rgb[..., 2]
+
+
+def nearest_color(colors, palette, chunk=65536):
+    """Index of the closest ``palette`` entry to each of ``colors`` (both (n, 3))"""
+    colors = np.asarray(colors, dtype=np.float32)
+    palette = np.asarray(palette, dtype=np.float32)
+    # |c - p|^2 = |c|^2 - 2 c.p + |p|^2, and |c|^2 doesn't change the argmin
+    norms = (palette ** 2).sum(axis=1)
+    nearest = np.empty(len(colors), dtype=np.intp)
+    for start in range(0, len(colors), chunk):
+        block = colors[start:start + chunk]
+        nearest[start:start + chunk] = (norms - 2 * block @ palette.T).argmin(axis=1)
+    return nearest
+
+
+def global_palette(images, colors=PALETTE_COLORS, iterations=8):
+    """One palette for every frame, from a sample of them
+
+    The distinct colors of ``images`` (RGB(A) arrays) are clustered by
+    k-means, weighted by how many pixels have them and started from the
+    most common ones. Each entry is then snapped to the most common color
+    of its cluster, so the flat colors a chart is drawn with come out
+    exact and only antialiased edges are approximated.
+    """
+    pixels = np.concatenate([np.asarray(image)[..., :3].reshape(-1, 3) for image in images])
+    unique, counts = np.unique(pack(pixels), return_counts=True)
+    rgb = unpack(unique).astype(np.float32)
+    if len(unique) <= colors:
+        return rgb.astype(np.uint8)
+    weights = counts.astype(np.float64)
+    centers = rgb[np.argsort(-counts, kind='stable')[:colors]]
+    for _ in range(iterations):
+        nearest = nearest_color(rgb, centers)
+        totals = np.bincount(nearest, weights, minlength=colors)
+        filled = totals > 0
+        for channel in range(3):
+            sums = np.bincount(nearest, weights * rgb[:, channel], minlength=colors)
+            centers[filled, channel] = sums[filled] / totals[filled]
+    nearest = nearest_color(rgb, centers)
+    # Heaviest member of each (non-empty) cluster
+    order = np.lexsort((-counts, nearest))
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = nearest[order][1:] != nearest[order][:-1]
+    return rgb[order[first]].astype(np.uint8)
+
+
+class PaletteMapper:
+    """Maps RGBA frames to indices into a fixed palette.
+
+    Palette colors map to themselves exactly; any other color goes to the
+    entry closest to its bin in a 6-bit-per-channel lookup table, which is
+    computed once, so mapping a frame is a few array lookups.
+    """
+
+    def __init__(self, palette):
+        self.palette = np.asarray(palette, dtype=np.uint8)
+        packed = pack(self.palette)
+        self._order = np.argsort(packed).astype(np.uint8)
+        self._sorted = packed[self._order]
+        levels = np.arange(64) * 4 + 2  # Bin centers
+        grid = np.stack(np.meshgrid(levels, levels, levels, indexing='ij'), axis=-1)
+        self._lut = nearest_color(grid.reshape(-1, 3), self.palette).astype(np.uint8)
+
+    def indices(self, rgba, size):
+        """``(height, width)`` palette indices of any buffer of RGBA bytes"""
+        width, height = size
+        pixels = np.frombuffer(rgba, dtype=np.uint8).reshape(height, width, 4)
+        r, g, b = (pixels[..., channel].astype(np.uint32) for channel in range(3))
+        indices = self._lut[((r >> 2) << 12) | ((g >> 2) << 6) | (b >> 2)]
+        packed = (r << 16) | (g << 8) | b
+        position = np.minimum(np.searchsorted(self._sorted, packed), len(self._sorted) - 1)
+        exact = self._sorted[position] == packed
+        indices[exact] = self._order[position[exact]]
+        return indices
+
+    def snap(self, rgba, size):
+        """The frame with every pixel replaced by its palette color, as RGBA"""
+        colors = self.palette[self.indices(rgba, size)]
+        return np.concatenate([colors, np.full(colors.shape[:2] + (1,), 255, np.uint8)], axis=-1)
+
+
+class GifWriter:
+    """Animated GIF from raw RGBA frames, with a global palette and frame deltas.
+
+    Drop-in for ``RawVideoWriter``: same ``write_frame``/``grab`` and
+    ``durations``. Every frame is mapped to one ``palette`` (see
+    ``global_palette``), and only the rectangle that changed since the
+    previous frame is stored, with its unchanged pixels transparent so they
+    compress to almost nothing. A frame identical to the previous one only
+    lengthens it. Frames are written as they come, to a temporary file that
+    replaces ``output_path`` once the GIF is complete; only the previous
+    frame is kept.
+    """
+
+    def __init__(self, output_path, size, palette, fps=20, durations=None, loop=0):
+        self.output_path = output_path
+        self.size = size
+        self.fps = fps
+        self.loop = loop
+        self.mapper = PaletteMapper(palette)
+        if len(self.mapper.palette) > PALETTE_COLORS:
+            raise ValueError(f"GIF palettes have at most {PALETTE_COLORS} colors "
+                             f"(one index is transparency), got {len(self.mapper.palette)}")
+        colors = np.zeros((256, 3), dtype=np.uint8)
+        colors[:len(self.mapper.palette)] = self.mapper.palette
+        self._palette = colors.tobytes()
+        self.durations = None if durations is None else [int(d) for d in durations]
+        self._written = 0
+        self._file = None
+        self._tmp = None
+        self._previous = None
+        self._pending = None
+        # Frame periods written so far, for rounding delays to 1/100 s
+        self._periods = 0
+
+    def _image(self, indices):
+        image = Image.fromarray(indices)
+        image.putpalette(self._palette)
+        return image
+
+    def __enter__(self):
+        # Opening the existing temporary file keeps its umask permissions
+        self._tmp = temporary_path(self.output_path)
+        self._file = open(self._tmp, 'wb')
+        try:
+            header, _ = GifImagePlugin.getheader(
+                self._image(np.zeros(self.size[::-1], np.uint8)), info={'loop': self.loop})
+            self._file.write(b''.join(header))
+        except BaseException:
+            self._file.close()
+            os.remove(self._tmp)
+            raise
+        return self
+
+    def write_frame(self, rgba):
+        """Write one frame: any buffer of ``height * width * 4`` RGBA bytes"""
+        periods = self.durations[self._written] if self.durations is not None else 1
+        self._written += 1
+        indices = self.mapper.indices(rgba, self.size)
+        if self._previous is None:
+            self._pending = [indices, (0, 0), False, periods]
+            self._previous = indices
+            return
+        changed = indices != self._previous
+        rows = np.flatnonzero(changed.any(axis=1))
+        if not len(rows):
+            self._pending[3] += periods
+            return
+        cols = np.flatnonzero(changed.any(axis=0))
+        box = slice(rows[0], rows[-1] + 1), slice(cols[0], cols[-1] + 1)
+        delta = np.where(changed[box], indices[box], np.uint8(TRANSPARENT))
+        self._flush()
+        self._pending = [delta, (int(cols[0]), int(rows[0])), True, periods]
+        self._previous = indices
+
+    def grab(self, canvas):
+        """Write the current contents of an already drawn Agg canvas"""
+        self.write_frame(canvas.buffer_rgba())
+
+    def _flush(self):
+        indices, offset, transparent, periods = self._pending
+        # GIF delays are in 1/100 s: round the frame's end, not its length,
+        # so the rounding errors don't add up
+        start = round(self._periods * 100 / self.fps)
+        self._periods += periods
+        delay = round(self._periods * 100 / self.fps) - start
+        params = {'duration': delay * 10, 'disposal': 1}
+        if transparent:
+            params['transparency'] = TRANSPARENT
+        self._file.write(b''.join(GifImagePlugin.getdata(self._image(indices), offset, **params)))
+
+    def __exit__(self, exc_type, exc, tb):
+        complete = False
+        try:
+            if exc_type is None and self._pending is not None:
+                self._flush()
+                self._file.write(b';')
+                complete = True
+        finally:
+            self._file.close()
+            if complete:
+                os.replace(self._tmp, self.output_path)
+            else:
+                os.remove(self._tmp)
+
+
+class WebPWriter(RawVideoWriter):
+    """Lossless animated WebP through ffmpeg's libwebp, on a global palette.
+
+    Frames are snapped to ``palette`` first, so libwebp stores each one with
+    its color-indexing transform, and its animation encoder keeps only the
+    rectangle that changed from the frame before. Holds (``durations``) are
+    sent as repeated frames, which that encoder merges into one longer frame.
+    """
+
+    def __init__(self, output_path, size, palette, fps=20, durations=None, loop=0):
+        super().__init__(output_path, size, fps=fps, codec='libwebp_anim', pix_fmt='bgra',
+                         bitrate=None, extra_args=['-lossless', '1', '-compression_level', '6',
+                                                   '-loop', str(loop)])
+        self.mapper = PaletteMapper(palette)
+        self.holds = None if durations is None else [int(d) for d in durations]
+        self._frames = 0
+
+    def write_frame(self, rgba):
+        snapped = self.mapper.snap(rgba, (self.width, self.height))
+        repeats = self.holds[self._frames] if self.holds is not None else 1
+        self._frames += 1
+        for _ in range(repeats):
+            super().write_frame(snapped)
@@ -0,0 +1,120 @@
+import numpy as np
+from matplotlib.artist import Artist
+from matplotlib.collections import PolyCollection
+from matplotlib.text import Text
+from matplotlib.transforms import Bbox
+
+
+class BarCollection(PolyCollection):
+    """Vertical bars drawn as a single collection.
+
+    Heights, positions, colors and alphas of all bars are set at once from
+    arrays (``set_heights``, ``set_positions``, ``set_facecolor``,
+    ``set_alpha``), so updating and drawing a chart is one call however
+    many bars it has. Pass it to ``ax.add_collection``.
+    """
+
+    def __init__(self, x, heights, width, bottom=0.0, **kwargs):
+        # Same corners as Rectangle patches (collections default to round)
+        kwargs.setdefault('joinstyle', 'miter')
+        kwargs.setdefault('capstyle', 'butt')
+        self.width = width
+        self.bottom = bottom
+        self.x = np.asarray(x, dtype=float)
+        self.heights = np.broadcast_to(np.asarray(heights, dtype=float), self.x.shape)
+        super().__init__(self._verts(), **kwargs)
+
+    def _verts(self):
+        left = self.x - self.width / 2
+        right = left + self.width
+        bottom = np.full_like(left, self.bottom)
+        top = bottom + self.heights
+        # Corners in Rectangle's order, one (4, 2) polygon per bar
+        return np.stack([np.stack([left, bottom], axis=-1), np.stack([right, bottom], axis=-1),
+                         np.stack([right, top], axis=-1), np.stack([left, top], axis=-1)],
+                        axis=1)
+
+    def set_heights(self, heights):
+        self.heights = np.broadcast_to(np.asarray(heights, dtype=float), self.x.shape)
+        self.set_verts(self._verts())
+
+    def set_alpha(self, alpha):
+        """One alpha for every bar, or one per bar"""
+        if alpha is not None:
+            # Kept per bar, so a single alpha can follow per-bar ones
+            alpha = np.broadcast_to(np.asarray(alpha, dtype=float), self.x.shape)
+        super().set_alpha(alpha)
+
+    def set_positions(self, x):
+        """Move the bar centers"""
+        self.x = np.asarray(x, dtype=float)
+        self.heights = np.broadcast_to(self.heights, self.x.shape)
+        self.set_verts(self._verts())
+
+
+class LabelCollection(Artist):
+    """Text labels drawn by a single artist, e.g. the value above each bar.
+
+    Positions, strings and alphas are arrays updated in one call. Drawing
+    poses one ``Text`` for each label in turn, so it takes the same font
+    properties (``**text_kwargs``) as ``ax.text``. Add it with
+    ``ax.add_artist``; like ``ax.text`` labels it is not clipped to the axes.
+    """
+
+    def __init__(self, x, y, texts, **text_kwargs):
+        super().__init__()
+        self.set_zorder(text_kwargs.pop('zorder', Text.zorder))
+        alpha = text_kwargs.pop('alpha', 1.0)
+        # The shared Text takes its transform from this artist when posed
+        if 'transform' in text_kwargs:
+            self.set_transform(text_kwargs.pop('transform'))
+        self._text = Text(0, 0, '', **text_kwargs)
+        self.x = np.asarray(x, dtype=float)
+        self.y = np.broadcast_to(np.asarray(y, dtype=float), self.x.shape)
+        self.texts = list(texts)
+        self.alphas = np.full(self.x.shape, alpha, dtype=float)
+        self.set_clip_on(False)
+
+    def set_positions(self, x=None, y=None):
+        if x is not None:
+            self.x = np.asarray(x, dtype=float)
+        if y is not None:
+            self.y = np.broadcast_to(np.asarray(y, dtype=float), self.x.shape)
+        self.stale = True
+
+    def set_ys(self, y):
+        self.set_positions(y=y)
+
+    def set_texts(self, texts):
+        self.texts = list(texts)
+        self.stale = True
+
+    def set_alphas(self, alphas):
+        self.alphas = np.broadcast_to(np.asarray(alphas, dtype=float), self.x.shape)
+        self.stale = True
+
+    def _posed(self):
+        """Pose the shared Text as each visible label in turn"""
+        text = self._text
+        # Transform, clipping and visibility come from this artist
+        Artist.update_from(text, self)
+        if text.get_figure() is None:
+            text.set_figure(self.get_figure())
+        for x, y, string, alpha in zip(self.x, self.y, self.texts, self.alphas):
+            if alpha == 0 or not string:
+                continue
+            text.set_position((x, y))
+            text.set_text(string)
+            text.set_alpha(float(alpha))
+            yield text
+
+    def draw(self, renderer):
+        if not self.get_visible():
+            return
+        for text in self._posed():
+            text.draw(renderer)
+        self.stale = False
+
+    def get_window_extent(self, renderer=None):
+        extents = [text.get_window_extent(renderer) for text in self._posed()]
+        return Bbox.union(extents) if extents else Bbox.null()
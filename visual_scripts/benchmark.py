@@ -0,0 +1,233 @@
+"""Benchmarks for the static plots and the LIBERO animation
+
+Every case runs in a fresh worker process, so its peak RSS is its own, and
+reports wall time, frames (or charts) per second and peak RSS. Results are
+written as JSON and compared against a stored baseline: a case that got
+slower or bigger by more than ``--tolerance`` is flagged and the run exits
+with status 1. Baselines are per machine, so they live in the user's data
+directory (not the cache, whose entries get evicted) unless ``--baseline``
+says otherwise.
+
+    python -m visual_scripts bench                  # run, compare, write results
+    python -m visual_scripts bench --save-baseline  # make this run the baseline
+    python -m visual_scripts bench --filter 'plot_*'
+
+Everything runs offline and only needs ffmpeg on the PATH (or in
+``animation.ffmpeg_path``) for the animation cases.
+"""
+import argparse
+import contextlib
+import fnmatch
+import io
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+BASELINE_PATH = os.environ.get('VLA0_BENCHMARK_BASELINE',
+                               os.path.join(os.path.expanduser('~'), '.local', 'share',
+                                            'vla0-visuals', 'benchmark_baseline.json'))
+RESULTS_PATH = 'benchmark_results.json'
+
+# PDFs are vector, so dpi only matters for the PNG cases
+PLOT_DPIS = (150, 300, 600)
+# Frame size (16x11 inches at dpi) and frame count of each animation case
+ANIMATION_CASES = (
+    {'dpi': 50, 'frames': 220},
+    {'dpi': 100, 'frames': 40},
+    {'dpi': 100, 'frames': 220},
+    {'dpi': 100, 'frames': 220, 'blit': True},
+    {'dpi': 240, 'frames': 40},
+)
+# Best-of repeats per kind; the animation cases take long enough on their own
+REPEATS = {'plot': 5, 'animation': 1, 'phases': 1}
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024**2 if sys.platform == 'darwin' else 1024)
+
+
+def cases():
+    """Every benchmark as (name, kind, params)"""
+    for table in ('without', 'with'):
+        yield f'plot_{table}_pdf', 'plot', {'table': table, 'fmt': 'pdf', 'dpi': 300}
+        for dpi in PLOT_DPIS:
+            yield f'plot_{table}_{dpi}dpi_png', 'plot', {'table': table, 'fmt': 'png', 'dpi': dpi}
+    for case in ANIMATION_CASES:
+        mode = 'blit' if case.get('blit') else 'draw'
+        yield (f"animation_{case['dpi']}dpi_{case['frames']}f_{mode}", 'animation',
+               dict(case, blit=case.get('blit', False)))
+    for mode in ('draw', 'blit'):
+        yield f'phases_{mode}', 'phases', {'blit': mode == 'blit'}
+
+
+def bench_plot(table, fmt, dpi, repeat):
+    import create_libero_plot as plots
+    models, scores, color, hatching = {
+        'without': (plots.models_without_pretrain, plots.scores_without_pretrain,
+                    plots.color_without, False),
+        'with': (plots.models_with_pretrain, plots.scores_with_pretrain,
+                 plots.color_with, True),
+    }[table]
+    best = float('inf')
+    with tempfile.TemporaryDirectory() as tmp:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            plots.create_plot(models, scores, color, table, f'plot.{fmt}', add_hatching=hatching,
+                              output_dir=tmp, dpi=dpi, cache_dir=None)
+            best = min(best, time.perf_counter() - start)
+    return [{'wall_s': best, 'fps': 1 / best}]
+
+
+def bench_animation(dpi, frames, blit, repeat):
+    import create_libero_animation as animation
+    best = float('inf')
+    with tempfile.TemporaryDirectory() as tmp:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            animation.create_animated_plot(os.path.join(tmp, 'animation.mp4'), blit=blit,
+                                           duration=frames / animation.FPS, dpi=dpi,
+                                           cache_dir=None)
+            best = min(best, time.perf_counter() - start)
+    return [{'wall_s': best, 'fps': frames / best}]
+
+
+def bench_phases(blit, repeat):
+    """Per-frame cost of each phase: timeline update, draw and grabbing the pixels"""
+    import create_libero_animation as animation
+    fig, timeline = animation.build_animation()
+    results = []
+    for phase, (start, stop) in timeline.phases.items():
+        best = float('inf')
+        for _ in range(repeat):
+            begin = time.perf_counter()
+            for _ in animation.render_frames(fig, timeline.apply, range(start, stop), blit):
+                bytes(fig.canvas.buffer_rgba())
+            best = min(best, time.perf_counter() - begin)
+        frames = max(stop - start, 1)
+        results.append({'suffix': phase, 'wall_s': best, 'fps': frames / best,
+                        'ms_per_frame': 1000 * best / frames})
+    return results
+
+
+def run_case(kind, params, repeat):
+    """Run one case in this (fresh) process; its output is discarded"""
+    bench = {'plot': bench_plot, 'animation': bench_animation, 'phases': bench_phases}[kind]
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = bench(repeat=repeat, **params)
+    rss = peak_rss_mb()
+    for result in results:
+        result['peak_rss_mb'] = rss
+    return results
+
+
+def machine():
+    import matplotlib
+    import numpy
+    return {'platform': platform.platform(), 'machine': platform.machine(),
+            'python': platform.python_version(), 'cpus': os.cpu_count(),
+            'matplotlib': matplotlib.__version__, 'numpy': numpy.__version__}
+
+
+def run(patterns=('*',), repeat=None):
+    results = {}
+    context = multiprocessing.get_context('spawn')
+    for name, kind, params in cases():
+        if not any(fnmatch.fnmatch(name, pattern) for pattern in patterns):
+            continue
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            outcome = pool.submit(run_case, kind, params, repeat or REPEATS[kind]).result()
+        for result in outcome:
+            suffix = result.pop('suffix', None)
+            key = f'{name}_{suffix}' if suffix else name
+            results[key] = dict(result, kind=kind, params=params)
+            print(f"  {key:<36} {result['wall_s']:9.3f} s {result['fps']:9.1f} fps "
+                  f"{result['peak_rss_mb']:8.1f} MB", flush=True)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Print each case against the baseline; return the names that regressed"""
+    regressions = []
+    print(f"\n{'benchmark':<36} {'wall':>9} {'vs base':>8} {'peak RSS':>9} {'vs base':>8}")
+    for name, result in results.items():
+        base = baseline.get(name)
+        row = f"{name:<36} {result['wall_s']:8.3f}s"
+        if base is None:
+            print(row + f" {'new':>8} {result['peak_rss_mb']:7.1f}MB")
+            continue
+        time_change = result['wall_s'] / base['wall_s'] - 1
+        rss_change = result['peak_rss_mb'] / base['peak_rss_mb'] - 1
+        regressed = time_change > tolerance or rss_change > tolerance
+        if regressed:
+            regressions.append(name)
+        print(row + f" {time_change:+8.0%} {result['peak_rss_mb']:7.1f}MB {rss_change:+8.0%}"
+              + ("  REGRESSION" if regressed else ""))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the plots and the animation")
+    parser.add_argument('--filter', nargs='+', default=['*'], metavar='PATTERN',
+                        help="Only run benchmarks whose name matches, e.g. 'plot_*'")
+    parser.add_argument('--repeat', type=int,
+                        help="Best-of repeats per case (default: 5 for plots, 1 otherwise)")
+    parser.add_argument('--output', default=RESULTS_PATH, help="Where to write the results")
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="Baseline results to compare to")
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="Store this run as the baseline instead of comparing")
+    parser.add_argument('--tolerance', type=float, default=0.15,
+                        help="Flag cases more than this fraction slower or bigger")
+    parser.add_argument('--list', action='store_true', help="List the benchmarks and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name, _, params in cases():
+            print(f"{name:<36} {params}")
+        return
+
+    print("Running benchmarks...")
+    report = {'machine': machine(), 'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+              'results': run(args.filter, args.repeat)}
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)['results']
+        # Cases left out by --filter keep their previous baseline
+        report['results'] = dict(baseline, **report['results'])
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one")
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline['machine'] != report['machine']:
+        print("Note: the baseline was recorded on a different machine or library versions")
+    regressions = compare(report['results'], baseline['results'], args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}: "
+              + ", ".join(regressions))
+        raise SystemExit(1)
+    print(f"\nNo regressions beyond {args.tolerance:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import hashlib
+import inspect
+import json
+import os
+import re
+import shutil
+import tempfile
+
+import matplotlib
+
+CACHE_DIR = os.environ.get('VLA0_CACHE_DIR',
+                           os.path.join(os.path.expanduser('~'), '.cache', 'vla0-visuals'))
+CACHE_MAX_BYTES = 2 * 1024**3  # 2 GB
+
+# rcParams that don't change what ends up in a rendered file
+_IGNORED_RCPARAMS = ('backend', 'interactive', 'webagg.', 'tk.', 'macosx.', 'keymap.',
+                     'toolbar', 'savefig.directory', 'figure.raise_window', 'animation.')
+
+
+def render_settings():
+    """Everything outside the script that affects rendered pixels"""
+    rc = {key: value for key, value in matplotlib.rcParams.items()
+          if not key.startswith(_IGNORED_RCPARAMS)}
+    return {'matplotlib': matplotlib.__version__, 'rcParams': rc}
+
+
+def source_of(*functions):
+    """Source code of the drawing functions, so editing them invalidates the cache"""
+    return [inspect.getsource(function) for function in functions]
+
+
+def content_key(*parts):
+    """Stable SHA-256 over JSON-able inputs (anything else is hashed by repr)"""
+    blob = json.dumps(parts, sort_keys=True, default=repr, ensure_ascii=False)
+    return hashlib.sha256(blob.encode('utf-8')).hexdigest()
+
+
+def file_digest(path):
+    """SHA-256 of a file's content, read in chunks"""
+    with open(path, 'rb') as f:
+        return hashlib.file_digest(f, 'sha256').hexdigest()
+
+
+class BuildCache:
+    """Content-addressed artifact store with size-bounded LRU eviction.
+
+    Entries are files named by their key, in a subdirectory named by the
+    key's first two characters. Reading an entry refreshes its mtime, and
+    ``evict()`` deletes the least recently used entries until they fit in
+    ``max_bytes``. Anything else in the directory is left alone.
+    """
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key):
+        return os.path.join(self.directory, key[:2], key)
+
+    def __contains__(self, key):
+        return os.path.exists(self.path(key))
+
+    def _touch(self, path):
+        try:
+            os.utime(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def get(self, key):
+        """Cached bytes for ``key``, or None"""
+        path = self.path(key)
+        if not self._touch(path):
+            return None
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except FileNotFoundError:  # Evicted by a concurrent run
+            return None
+
+    def put(self, key, data):
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename, so readers never see a partial entry
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def fetch(self, key, output_path):
+        """Copy the cached artifact to ``output_path``; False on a miss"""
+        path = self.path(key)
+        if not self._touch(path):
+            return False
+        try:
+            shutil.copyfile(path, output_path)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def store(self, key, output_path):
+        """Keep a copy of a freshly rendered artifact"""
+        with open(output_path, 'rb') as f:
+            self.put(key, f.read())
+
+    def evict(self):
+        """Delete least recently used entries until under ``max_bytes``"""
+        entries = []
+        for shard in os.listdir(self.directory):
+            directory = os.path.join(self.directory, shard)
+            if not re.fullmatch(r'[0-9a-f]{2}', shard) or not os.path.isdir(directory):
+                continue
+            for name in os.listdir(directory):
+                # Skips put()'s temporary files, still being written
+                if not re.fullmatch(r'[0-9a-f]{64}', name):
+                    continue
+                path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
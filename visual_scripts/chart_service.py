@@ -0,0 +1,347 @@
+"""Local HTTP service that renders the charts and returns their bytes
+
+Dashboards and reports POST a table (or animation options) as JSON and
+get the rendered file back, instead of shelling out to the scripts:
+
+    POST /plot       {"title": ..., "models": [...], "scores": [...],
+                      "color": "#6BAED6", "add_hatching": false,
+                      "export": "png@150"}           -> the chart (png, pdf, svg, ...)
+    POST /animation  {"fps": 20, "duration": 11, "dpi": 50, "crf": 23}
+                                                     -> the MP4
+    GET  /stats      cache and request counters as JSON
+
+Renders run in a pool of worker processes that keep their figures laid out
+between requests. Results are kept in a memory-bounded LRU keyed on the
+normalized request, and identical requests that arrive while one is
+rendering wait for that render instead of starting their own.
+
+    python -m visual_scripts serve --port 8765
+    python -m visual_scripts serve --socket /tmp/vla0-charts.sock
+    curl --unix-socket /tmp/vla0-charts.sock -d @table.json localhost/plot -o chart.png
+"""
+import argparse
+import contextlib
+import io
+import json
+import math
+import mimetypes
+import multiprocessing
+import os
+import socketserver
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from matplotlib.colors import is_color_like
+
+from build_cache import CACHE_DIR, content_key
+from figure_export import parse_exports
+
+# Defaults filled into requests, so equivalent requests share a cache entry.
+# The color is create_libero_plot.color_with, which only the workers import.
+PLOT_DEFAULTS = {'color': '#6BAED6', 'add_hatching': False, 'export': 'png', 'dpi': 300}
+ANIMATION_DEFAULTS = {'fps': 20, 'duration': None, 'dpi': 100, 'vfr': True, 'codec': 'libx264',
+                      'crf': None, 'bitrate': 2000, 'preset': None, 'pix_fmt': 'yuv420p'}
+MAX_REQUEST_BYTES = 1024**2
+
+
+def positive_int(request, name):
+    """``request[name]`` as an int; ValueError unless it is a whole number >= 1
+
+    Rather than ``int()``, which truncates fractions and overflows on the
+    ``inf`` that JSON numbers like 1e400 parse to.
+    """
+    value = request[name]
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    if not isinstance(value, int) or isinstance(value, bool) or value < 1:
+        raise ValueError(f"'{name}' must be a positive integer")
+    return value
+
+
+def plot_request(body):
+    """Validated, normalized /plot request; ValueError on a bad one"""
+    request = dict(PLOT_DEFAULTS, **body)
+    unknown = set(request) - set(PLOT_DEFAULTS) - {'title', 'models', 'scores'}
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    if not isinstance(request.get('title'), str):
+        raise ValueError("'title' must be a string")
+    models, scores = request.get('models'), request.get('scores')
+    if not isinstance(models, list) or not isinstance(scores, list) or not models:
+        raise ValueError("'models' and 'scores' must be non-empty lists")
+    if len(models) != len(scores):
+        raise ValueError("'models' and 'scores' must have the same length")
+    request['models'] = [str(model) for model in models]
+    request['scores'] = [float(score) for score in scores]
+    if not all(math.isfinite(score) for score in request['scores']):
+        raise ValueError("'scores' must be finite numbers")
+    # Success rates in percent
+    if not all(0 <= score <= 100 for score in request['scores']):
+        raise ValueError("'scores' must be within 0-100")
+    if not isinstance(request['export'], str) or not isinstance(request['add_hatching'], bool):
+        raise ValueError("'export' must be a string and 'add_hatching' a boolean")
+    if not is_color_like(request['color']):
+        raise ValueError(f"Not a color: {request['color']!r}")
+    request['dpi'] = positive_int(request, 'dpi')
+    # Checks the spec, and gives the format
+    export, = parse_exports([request['export']], 'chart', request['dpi'])
+    # A spec like png@150 or png@640w overrides 'dpi'
+    if export.dpi is not None and not 10 <= export.dpi <= 1200:
+        raise ValueError("'dpi' must be within 10-1200")
+    if export.width is not None and not 16 <= export.width <= 8192:
+        raise ValueError("Pixel widths must be within 16-8192")
+    request['export'] = request['export'].strip().lower().lstrip('.')
+    return request, export.format
+
+
+def animation_request(body):
+    """Validated, normalized /animation request; ValueError on a bad one"""
+    request = dict(ANIMATION_DEFAULTS, **body)
+    unknown = set(request) - set(ANIMATION_DEFAULTS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    request['fps'] = positive_int(request, 'fps')
+    request['dpi'] = positive_int(request, 'dpi')
+    if request['duration'] is not None:
+        request['duration'] = float(request['duration'])
+    if not 1 <= request['fps'] <= 60 or not 10 <= request['dpi'] <= 240:
+        raise ValueError("'fps' must be within 1-60 and 'dpi' within 10-240")
+    if request['duration'] is not None and not 0 < request['duration'] <= 60:
+        raise ValueError("'duration' must be within 0-60 seconds")
+    if not isinstance(request['vfr'], bool):
+        raise ValueError("'vfr' must be a boolean")
+    for name in ('crf', 'bitrate'):
+        value = request[name]
+        if value is not None and (not isinstance(value, int) or isinstance(value, bool)
+                                  or value < 0):
+            raise ValueError(f"'{name}' must be a non-negative integer or null")
+    for name in ('codec', 'preset', 'pix_fmt'):
+        if request[name] is not None and not isinstance(request[name], str):
+            raise ValueError(f"'{name}' must be a string or null")
+    return request, 'mp4'
+
+
+# Per-process figure pool used by the plot workers, kept across requests
+_worker = {}
+
+
+def render_plot(request, cache_dir=None):
+    """Render one /plot request in a worker process; returns the file's bytes"""
+    import create_libero_plot as plots
+    if 'pool' not in _worker:
+        _worker['pool'] = plots.FigurePool()
+    export, = parse_exports([request['export']], 'chart', request['dpi'])
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+        plots.create_plot(request['models'], request['scores'], request['color'],
+                          request['title'], 'chart.' + export.format,
+                          add_hatching=request['add_hatching'], output_dir=tmp,
+                          dpi=request['dpi'], cache_dir=cache_dir, pool=_worker['pool'],
+                          exports=[request['export']])
+        with open(os.path.join(tmp, export.filename), 'rb') as f:
+            return f.read()
+
+
+def render_animation(request, cache_dir=None):
+    """Render one /animation request in a worker process; returns the MP4's bytes"""
+    import create_libero_animation as animation
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+        path = os.path.join(tmp, 'animation.mp4')
+        animation.create_animated_plot(path, blit=True, cache_dir=cache_dir, **request)
+        with open(path, 'rb') as f:
+            return f.read()
+
+
+class ByteLRU:
+    """Thread-safe LRU of rendered bytes, bounded by their total size"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            data = self.entries.get(key)
+            if data is not None:
+                self.entries.move_to_end(key)
+            return data
+
+    def put(self, key, data):
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self.entries:
+                self.size -= len(self.entries.pop(key))
+            self.entries[key] = data
+            self.size += len(data)
+            while self.size > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted)
+
+
+class ChartService:
+    """Renders requests in a process pool, through the LRU and request coalescing.
+
+    ``render(kind, request)`` returns the bytes. A request already in the
+    LRU is answered from memory; one identical to a render in flight waits
+    on that render's future, so N concurrent identical requests cost one.
+    """
+
+    RENDERERS = {'plot': render_plot, 'animation': render_animation}
+
+    def __init__(self, workers=None, cache_bytes=256 * 1024**2, cache_dir=CACHE_DIR):
+        context = multiprocessing.get_context('spawn')
+        self.pool = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+        self.cache = ByteLRU(cache_bytes)
+        self.cache_dir = cache_dir
+        self.stats = {'requests': 0, 'hits': 0, 'coalesced': 0, 'renders': 0, 'errors': 0}
+        self._in_flight = {}
+        # Reentrant: a render that is already done runs its callback right away
+        self._lock = threading.RLock()
+
+    def render(self, kind, request):
+        key = content_key('chart_service', kind, request)
+        with self._lock:
+            self.stats['requests'] += 1
+            data = self.cache.get(key)
+            if data is not None:
+                self.stats['hits'] += 1
+                return data
+            future = self._in_flight.get(key)
+            if future is None:
+                self.stats['renders'] += 1
+                future = self.pool.submit(self.RENDERERS[kind], request, self.cache_dir)
+                self._in_flight[key] = future
+                future.add_done_callback(lambda done: self._finish(key, done))
+            else:
+                self.stats['coalesced'] += 1
+        return future.result()
+
+    def _finish(self, key, future):
+        with self._lock:
+            del self._in_flight[key]
+            if future.exception() is None:
+                self.cache.put(key, future.result())
+            else:
+                self.stats['errors'] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.stats, in_flight=len(self._in_flight),
+                        cached=len(self.cache.entries), cached_bytes=self.cache.size)
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+
+class ChartRequestHandler(BaseHTTPRequestHandler):
+    """JSON in, rendered bytes out; errors come back as ``{"error": ...}``"""
+
+    PARSERS = {'/plot': ('plot', plot_request), '/animation': ('animation', animation_request)}
+
+    def do_GET(self):
+        if self.path != '/stats':
+            return self.send_json(HTTPStatus.NOT_FOUND, {'error': f"No such endpoint: {self.path}"})
+        self.send_json(HTTPStatus.OK, self.server.service.snapshot())
+
+    def do_POST(self):
+        if self.path not in self.PARSERS:
+            return self.send_json(HTTPStatus.NOT_FOUND, {'error': f"No such endpoint: {self.path}"})
+        kind, parse = self.PARSERS[self.path]
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            return self.send_json(HTTPStatus.BAD_REQUEST, {'error': "Invalid Content-Length"})
+        if length > MAX_REQUEST_BYTES:
+            return self.send_json(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                                  {'error': f"Requests are limited to {MAX_REQUEST_BYTES} bytes"})
+        try:
+            body = json.loads(self.rfile.read(length) or b'{}')
+            if not isinstance(body, dict):
+                raise ValueError("The request must be a JSON object")
+            request, fmt = parse(body)
+        except (ValueError, TypeError, OverflowError) as error:
+            # OverflowError: float() of a JSON integer too large for a double
+            return self.send_json(HTTPStatus.BAD_REQUEST, {'error': str(error)})
+        try:
+            data = self.server.service.render(kind, request)
+        except Exception as error:
+            self.log_error("Render failed: %r", error)
+            return self.send_json(HTTPStatus.INTERNAL_SERVER_ERROR,
+                                  {'error': f"Render failed: {error}"})
+        self.send_bytes(HTTPStatus.OK, data,
+                        mimetypes.guess_type(f'chart.{fmt}')[0] or 'application/octet-stream')
+
+    def send_json(self, status, payload):
+        self.send_bytes(status, json.dumps(payload).encode(), 'application/json')
+
+    def send_bytes(self, status, data, content_type):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def address_string(self):
+        # Unix socket peers have no address
+        return self.client_address[0] if self.client_address else 'unix'
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """``ThreadingHTTPServer`` on a Unix domain socket"""
+
+    daemon_threads = True
+
+
+def serve(service, host='127.0.0.1', port=8765, socket_path=None):
+    """Serve ``service`` until interrupted"""
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        server = UnixHTTPServer(socket_path, ChartRequestHandler)
+        where = socket_path
+    else:
+        server = ThreadingHTTPServer((host, port), ChartRequestHandler)
+        where = f'http://{host}:{server.server_address[1]}'
+    server.service = service
+    print(f"Serving charts on {where} (Ctrl-C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+        if socket_path and os.path.exists(socket_path):
+            os.remove(socket_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve rendered LIBERO charts over HTTP")
+    parser.add_argument('--host', default='127.0.0.1', help="Interface to listen on")
+    parser.add_argument('--port', type=int, default=8765, help="TCP port (0 picks a free one)")
+    parser.add_argument('--socket', metavar='PATH',
+                        help="Listen on this Unix domain socket instead of TCP")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="Render processes")
+    parser.add_argument('--memory-cache-mb', type=int, default=256,
+                        help="Size of the in-memory LRU of rendered bytes")
+    parser.add_argument('--cache-dir', default=CACHE_DIR,
+                        help="Build cache the workers also read and fill")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Don't use the on-disk build cache")
+    args = parser.parse_args(argv)
+    service = ChartService(args.workers, args.memory_cache_mb * 1024**2,
+                           None if args.no_cache else args.cache_dir)
+    serve(service, args.host, args.port, args.socket)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,28 @@
+import argparse
+import itertools
+import json
+import os
+import sys
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+
 import matplotlib.pyplot as plt
 import numpy as np
-import seaborn as sns
-from matplotlib.patches import Rectangle
-from matplotlib.animation import FuncAnimation, FFMpegWriter
-import matplotlib
 
-# Fix Type 3 font issue
-matplotlib.rcParams['pdf.fonttype'] = 42
-matplotlib.rcParams['ps.fonttype'] = 42
+from animated_image import GifWriter, PaletteMapper, WebPWriter, global_palette
+from bar_collections import BarCollection, LabelCollection
+from build_cache import CACHE_DIR, BuildCache, content_key, file_digest, render_settings, source_of
+from frame_compositor import FrameCompositor, Layer, blend
+from frame_profiler import NO_PROFILER, FrameProfiler
+from paths import SITE_ROOT
+from plot_style import apply_style
+from timeline import Timeline, blink, ease_in_out, second_half, step
+from video_writer import RawVideoWriter
 
-# Set seaborn style
-sns.set_style("whitegrid")
-plt.rcParams['font.family'] = 'Helvetica'
+# Whitegrid style, TrueType fonts, Helvetica when it's installed
+apply_style()
 
 # Data from the table
 models_without_pretrain = [
@@ -45,313 +56,892 @@ color_ours = '#f97316'     # Vibrant orange for VLA-0
 bg_color = '#ffffff'       # White background
 text_color = '#1e293b'     # Dark text
 
-def create_animated_plot():
-    """Create animated bar chart with both plots stacked vertically"""
+OUTPUT_PATH = os.path.join(SITE_ROOT, 'Videos', 'libero_results.mp4')
+RACE_OUTPUT_PATH = os.path.join(os.path.dirname(OUTPUT_PATH), 'libero_race.mp4')
+
+# 16x11 inch figure at 100 dpi -> 1600x1100 frames
+DPI = 100
+
+# Raw frames rendered by --jobs workers but not yet encoded, whatever the job
+# count: about 36 frames at 100 dpi, 6 at 240
+MAX_BUFFERED_BYTES = 256 * 1024**2
+
+# The white boxes behind "SOTA" and the plot 2 annotation overlap the value
+# labels, so they blink and settle at this alpha while their text is opaque
+BOX_ALPHA = 0.2
+
+# Bar race (--race LOG): our checkpoints against the pretrained baselines.
+# Each checkpoint-to-checkpoint transition takes this many seconds, and the
+# last checkpoint is held at the end.
+RACE_BASELINES = [(model, score) for model, score in zip(models_with_pretrain, scores_with_pretrain)
+                  if 'Ours' not in model]
+RACE_MODEL = models_with_pretrain[-1]
+RACE_CHECKPOINT_SECONDS = 0.2
+RACE_HOLD_SECONDS = 2.0
+
+# Animation timeline in seconds (11 seconds at 20fps)
+FPS = 20
+PHASES = {
+    'intro':    (0.0, 1.0),    # Plot 1 shows (baselines visible)
+    'grow1':    (1.0, 2.5),    # VLA-0 bar grows from 0 to 94.7
+    'blink1':   (2.5, 3.0),    # Horizontal line appears and blinks, "SOTA" text
+    'pause1':   (3.0, 5.0),    # Pause for reading SOTA
+    'fade1':    (5.0, 6.0),    # Plot 1 fades to 30% opacity
+    'fadein2':  (6.0, 6.5),    # Plot 2 baselines fade in
+    'grow2':    (6.5, 8.5),    # VLA-0 grows in plot 2
+    'blink2':   (8.5, 9.0),    # Horizontal line and text blink
+    'restore1': (9.0, 10.0),   # Plot 1 fades back to full opacity
+    'pause2':   (10.0, 11.0),  # Pause for reading text
+}
+
+
+def set_bbox_alpha(text, alpha):
+    text.get_bbox_patch().set_alpha(alpha)
+
+
+def set_ticklabel_alpha(axis, alpha):
+    for label in axis.get_ticklabels():
+        label.set_alpha(alpha)
+
+
+def set_grid_alpha(axis, alpha):
+    axis.grid(True, alpha=alpha)
+
+
+def capture_background(fig, animated):
+    """Redraw the figure without ``animated`` artists and cache the pixels"""
+    for artist in animated:
+        artist.set_animated(True)
+    fig.canvas.draw()
+    return fig.canvas.copy_from_bbox(fig.bbox)
+
+
+def draw_order(fig, artists):
+    """Sort artists the way ``Axes.draw`` would: by zorder, then insertion order"""
+    order = {}
+    for ax_index, ax in enumerate(fig.axes):
+        for i, child in enumerate(ax.get_children()):
+            order[child] = (ax_index, i)
+
+    def key(artist):
+        ax_index, i = order.get(artist, (0, 0))
+        return ax_index, artist.get_zorder(), i
+
+    return sorted(artists, key=key)
+
+
+def blit_frame(fig, background, animated):
+    """Restore the cached background and redraw the animated artists on top"""
+    fig.canvas.restore_region(background)
+    renderer = fig.canvas.get_renderer()
+    for artist in animated:
+        artist.draw(renderer)
+
+
+def stacked_above(fig, dirty):
+    """Static artists drawn above (higher zorder, overlapping) a dirty artist
+
+    Those must be redrawn every frame as well, or the dirty artist would be
+    composited on top of them and break the layering. A clipped dirty artist
+    may grow anywhere inside its clip box, so that box is used as its extent.
+    """
+    renderer = fig.canvas.get_renderer()
+    stacked = set()
+    for artist in dirty:
+        ax = artist.axes
+        if ax is None:
+            continue
+        if artist.get_clip_on() and artist.get_clip_box() is not None:
+            extent = artist.get_clip_box()
+        else:
+            extent = artist.get_window_extent(renderer)
+        for other in ax.get_children():
+            alpha = other.get_alpha()
+            if (other in dirty or other is ax.patch or not other.get_visible()
+                    or alpha is not None and np.all(np.equal(alpha, 0))):
+                continue
+            if other.get_zorder() > artist.get_zorder() and other.get_window_extent(renderer).overlaps(extent):
+                stacked.add(other)
+    return stacked
+
+
+def render_frames(fig, animate, frames, blit=False, profiler=NO_PROFILER):
+    """Advance ``animate`` through ``frames`` and draw each one on the canvas.
+
+    Yields each frame number once the canvas holds its pixels. With
+    ``blit=True``, ``animate`` must return the artists it modified; only
+    those are redrawn over a cached background, which is re-captured when
+    that set changes, i.e. at phase boundaries where an artist starts or
+    stops moving (e.g. plot 1 fading, plot 2 fading in), or when ``frames``
+    skips ahead. ``profiler`` times the update, capture and draw stages.
+    """
+    moving = set()
+    animated = []
+    background = None
+    last = None
+    try:
+        for frame in frames:
+            with profiler.span('update', frame):
+                dirty = set(animate(frame))
+            if not blit:
+                with profiler.span('draw', frame):
+                    fig.canvas.draw()
+            else:
+                if background is None or dirty != moving or frame != last + 1:
+                    with profiler.span('capture', frame):
+                        for artist in animated:
+                            artist.set_animated(False)
+                        moving = dirty
+                        animated = draw_order(fig, dirty | stacked_above(fig, dirty))
+                        background = capture_background(fig, animated)
+                with profiler.span('draw', frame):
+                    blit_frame(fig, background, animated)
+            last = frame
+            yield frame
+    finally:
+        # Leave the figure fully drawable for whoever renders it next
+        for artist in animated:
+            artist.set_animated(False)
+
+
+def layout_key(dpi):
+    """Hash of everything static in the animation: data, style, drawing code, settings"""
+    return content_key(
+        'libero_animation',
+        source_of(build_animation, set_bbox_alpha, set_ticklabel_alpha, set_grid_alpha,
+                  BarCollection, LabelCollection),
+        models_without_pretrain, scores_without_pretrain,
+        models_with_pretrain, scores_with_pretrain,
+        [color_without, color_with, color_ours, bg_color, text_color],
+        render_settings(), dpi)
+
+
+def frame_keys(fig, timeline, dpi):
+    """Content hash of every frame: the static layout plus each track's value.
+
+    Frames whose tracked values didn't change keep their key, so editing
+    one phase only invalidates the frames that phase touches.
+    """
+    labels = {}
+    for ax_index, ax in enumerate(fig.axes):
+        for i, child in enumerate(ax.get_children()):
+            labels[child] = (ax_index, i)
+    columns = [(labels[track.artist], track.name) for track in timeline.tracks]
+    layout = layout_key(dpi)
+    return [content_key(layout, columns, [track.values[frame].tolist() for track in timeline.tracks])
+            for frame in timeline.frames]
+
+
+def cached_frames(fig, timeline, frames, blit=False, cache=None, keys=None,
+                  profiler=NO_PROFILER, grab=lambda rgba: rgba):
+    """Yield ``(frame, RGBA buffer)`` for each frame, rendering only the cache misses.
+
+    Rendered frames are stored zlib-compressed under their ``keys`` entry;
+    flat chart colors compress very well. ``grab`` turns the canvas buffer
+    into what is yielded, e.g. ``bytes`` to copy it.
+    """
+    if cache is None:
+        for frame in render_frames(fig, timeline.apply, frames, blit, profiler):
+            with profiler.span('grab', frame):
+                rgba = grab(fig.canvas.buffer_rgba())
+            yield frame, rgba
+        return
+    missing = [frame for frame in frames if keys[frame] not in cache]
+    rendered = render_frames(fig, timeline.apply, missing, blit, profiler)
+    missing = set(missing)
+    for frame in frames:
+        with profiler.span('cache', frame):
+            data = None if frame in missing else cache.get(keys[frame])
+            if data is not None:
+                data = zlib.decompress(data)
+        if data is not None:
+            yield frame, data
+            continue
+        if frame not in missing:
+            # Evicted since we checked: drawn out of band, so not cached
+            with profiler.span('draw', frame):
+                timeline.apply(frame)
+                # A suspended blit keeps its moving artists out of full draws
+                animated = [artist for artist in fig.findobj() if artist.get_animated()]
+                for artist in animated:
+                    artist.set_animated(False)
+                fig.canvas.draw()
+                for artist in animated:
+                    artist.set_animated(True)
+            with profiler.span('grab', frame):
+                rgba = grab(fig.canvas.buffer_rgba())
+            yield frame, rgba
+            continue
+        next(rendered)
+        with profiler.span('grab', frame):
+            rgba = grab(fig.canvas.buffer_rgba())
+        with profiler.span('cache', frame):
+            cache.put(keys[frame], zlib.compress(rgba, 1))
+        yield frame, rgba
+
+
+def distinct_frames(timeline):
+    """Frames that differ from the one before, and how long each is shown
+
+    The last frame is always kept so a trailing hold keeps its length.
+    """
+    changed = timeline.changed_frames()
+    changed[-1] = True
+    frames = timeline.frames[changed]
+    return frames, np.diff(np.append(frames, timeline.n_frames))
+
+
+def save_frames(fig, timeline, writer, frames, repeats, blit=False, cache=None, keys=None,
+                profiler=NO_PROFILER):
+    """Render ``frames`` on the canvas and stream each buffer to ``writer``
+
+    ``repeats`` says how many times each frame is written: its hold length
+    for a constant frame rate video, 1 when the writer has durations.
+    """
+    with writer:
+        for (frame, rgba), repeat in zip(cached_frames(fig, timeline, frames, blit, cache, keys,
+                                                       profiler), repeats):
+            with profiler.span('write', frame):
+                for _ in range(repeat):
+                    writer.write_frame(rgba)
+
+
+def layered_artists(fig, timeline):
+    """Tracked artists plus the static ones drawn over them, in draw order
+
+    Overlaps are checked at the start of every phase and at the end.
+    """
+    tracked = {track.artist for track in timeline.tracks}
+    above = set()
+    for frame in sorted({start for start, _ in timeline.phases.values()}
+                        | {timeline.n_frames - 1}):
+        timeline.apply(min(frame, timeline.n_frames - 1))
+        above |= stacked_above(fig, tracked)
+    return draw_order(fig, tracked | above)
+
+
+def save_composited(fig, timeline, writer, frames, repeats, profiler=NO_PROFILER):
+    """Like ``save_frames``, but blend pre-rasterized layers instead of drawing"""
+    compositor = FrameCompositor(fig, timeline, layered_artists(fig, timeline))
+    with writer:
+        for frame, repeat in zip(frames, repeats):
+            with profiler.span('draw', frame):
+                rgba = compositor.frame(frame)
+            with profiler.span('write', frame):
+                for _ in range(repeat):
+                    writer.write_frame(rgba)
+
+
+# Animated image outputs, by extension; they take a palette instead of encoder options
+IMAGE_WRITERS = {'.gif': GifWriter, '.webp': WebPWriter}
+
+
+def animation_palette(fig, timeline, frames, samples=16):
+    """Global palette from ``samples`` frames spread over ``frames``"""
+    picked = np.unique(np.asarray(frames)[np.linspace(0, len(frames) - 1, samples).astype(int)])
+    images = []
+    for frame in picked:
+        timeline.apply(frame)
+        fig.canvas.draw()
+        # Every other pixel is plenty to find the colors
+        images.append(np.asarray(fig.canvas.buffer_rgba())[::2, ::2, :3].copy())
+    return global_palette(images)
+
+
+# Per-process animation used by the parallel workers, kept across chunks
+_worker = {}
+
+
+def render_chunk(frames, blit, fps, duration, dpi, cache_dir=None, profile=False):
+    """Render ``frames`` in a worker process.
+
+    Returns their RGBA bytes, and the profiler events when ``profile`` is set.
+    """
+    if _worker.get('key') != (fps, duration, dpi):
+        fig, timeline = build_animation(fps, duration, dpi)
+        _worker.update(key=(fps, duration, dpi), animation=(fig, timeline),
+                       frame_keys=frame_keys(fig, timeline, dpi))
+    fig, timeline = _worker['animation']
+    cache = BuildCache(cache_dir) if cache_dir else None
+    profiler = FrameProfiler(timeline.phase_of) if profile else NO_PROFILER
+    rendered = [rgba for _, rgba in cached_frames(fig, timeline, frames, blit, cache,
+                                                  _worker['frame_keys'], profiler, grab=bytes)]
+    return rendered, list(profiler.events)
+
+
+def save_parallel(timeline, writer, jobs, frames, repeats, blit=False, duration=None, dpi=DPI,
+                  cache_dir=None, chunk_size=10, max_buffered_frames=64, profiler=NO_PROFILER):
+    """Render chunks of ``frames`` across ``jobs`` processes and encode them in order.
+
+    Each frame is written ``repeats`` times, as in ``save_frames``.
+
+    At most ``max_buffered_frames`` frames are in flight; finished chunks
+    wait in that bounded reorder buffer until every earlier chunk has been
+    written, so memory stays flat regardless of clip length and job count.
+    Chunks shrink so every job still gets one. Workers are spawned rather
+    than forked so they don't inherit the ffmpeg pipe and keep it open.
+    """
+    frames = [int(frame) for frame in frames]
+    chunk_size = max(1, min(chunk_size, max_buffered_frames // jobs))
+    in_flight = max(1, max_buffered_frames // chunk_size)
+    chunks = [slice(start, start + chunk_size) for start in range(0, len(frames), chunk_size)]
+    profile = isinstance(profiler, FrameProfiler)
+    context = multiprocessing.get_context('spawn')
+
+    def write_chunk(future, chunk):
+        rendered, events = future.result()
+        if profile:
+            profiler.events.extend(events)
+        for frame, rgba, repeat in zip(frames[chunk], rendered, repeats[chunk]):
+            with profiler.span('write', frame):
+                for _ in range(repeat):
+                    writer.write_frame(rgba)
+
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=context) as pool, writer:
+        pending = deque()
+        for chunk in chunks:
+            pending.append((pool.submit(render_chunk, frames[chunk], blit, timeline.fps,
+                                        duration, dpi, cache_dir, profile), chunk))
+            if len(pending) >= in_flight:
+                write_chunk(*pending.popleft())
+        while pending:
+            write_chunk(*pending.popleft())
+
+
+def build_animation(fps=FPS, duration=None, dpi=DPI):
+    """Create animated bar chart with both plots stacked vertically
+
+    Lays out every artist and declares its motion on a ``Timeline``, without
+    rendering anything. Returns ``(fig, timeline)``; ``timeline.apply(frame)``
+    poses the figure for any frame, in any order.
+    """
     
     # Create figure with two subplots (vertical) with more spacing
-    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(16, 11))
+    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(16, 11), dpi=dpi)
     fig.patch.set_facecolor(bg_color)  # Light background for Twitter
     fig.subplots_adjust(hspace=0.45)  # More space between plots
     
-    # Total frames for animation (11 seconds at 20fps)
-    n_frames = 220
-    
-    # Initialize empty bars for both plots
+    # Bars, shadows and value labels of each plot are one collection each
     x1 = np.arange(len(models_without_pretrain))
     x2 = np.arange(len(models_with_pretrain))
+    scores1 = np.array(scores_without_pretrain)
+    scores2 = np.array(scores_with_pretrain)
+    is_ours1 = np.array(['Ours' in model for model in models_without_pretrain])
+    is_ours2 = np.array(['Ours' in model for model in models_with_pretrain])
     width = 0.6
+    shadow_offset = 0.03
+    
+    # Setup first subplot (without pretraining)
+    ax1.set_facecolor('#f8fafc')
+    # Baselines at full height, VLA-0 starts at 0
+    heights1 = np.where(is_ours1, 0, scores1)
+    bars1 = BarCollection(x1, heights1, width,
+                          facecolors=np.where(is_ours1, color_ours, color_without),
+                          alpha=0.9, edgecolors='#334155', linewidths=2, zorder=3)
+    ax1.add_collection(bars1)
+    
+    # Add 3D shadow effect
+    shadows1 = BarCollection(x1 + shadow_offset, heights1, width, bottom=shadow_offset,
+                             facecolors='#cbd5e1', alpha=0.5, zorder=1, edgecolors='none')
+    ax1.add_collection(shadows1)
+    
+    # Value text (VLA-0's is faded in by the timeline)
+    value_texts1 = LabelCollection(x1, heights1 + 1, [f'{score:.1f}' for score in scores1],
+                                   ha='center', va='bottom',
+                                   fontsize=15, fontweight='bold', color=text_color, zorder=4)
+    ax1.add_artist(value_texts1)
+    
+    # Add "SOTA" text annotation with its box (invisible initially)
+    ours1 = int(np.flatnonzero(is_ours1)[0])
+    ours_score = scores_without_pretrain[ours1]
+    ax1.sota_text = ax1.text(ours1, 97, 'SOTA',
+                            ha='center', va='bottom',
+                            fontsize=18, fontweight='bold', color=color_ours,
+                            alpha=0, zorder=5,
+                            bbox=dict(boxstyle='round,pad=0.5', facecolor='white',
+                                      edgecolor=color_ours, linewidth=2.5, alpha=0))
     
-    bars1 = []
-    bars2 = []
-    value_texts1 = []
-    value_texts2 = []
+    # Horizontal line starts invisible, will appear at VLA-0's score
+    line1 = ax1.axhline(y=ours_score, color='#64748b', linestyle='--', linewidth=3, 
+                       alpha=0, zorder=4)
+    ax1.baseline_line = line1
+    ax1.set_ylabel('Success Rate (%)', fontsize=19, fontweight='bold', color=text_color)
+    ax1.set_title('LIBERO: Models Without Large-Scale Action Pretraining', fontsize=18, 
+                 fontweight='600', pad=20, color=text_color)
+    ax1.set_xticks(x1)
+    ax1.set_xticklabels(models_without_pretrain, fontsize=14, rotation=0, color=text_color)
+    ax1.set_ylim(60, 100)
+    ax1.tick_params(axis='y', labelsize=17, colors=text_color)
+    ax1.tick_params(axis='x', labelsize=14, colors=text_color)
+    ax1.yaxis.grid(True, alpha=0.3, linestyle='-', linewidth=0.8, color='#cbd5e1', zorder=0)
+    ax1.set_axisbelow(True)
+    ax1.spines['top'].set_visible(False)
+    ax1.spines['right'].set_visible(False)
+    ax1.spines['left'].set_color(text_color)
+    ax1.spines['left'].set_linewidth(1.5)
+    ax1.spines['bottom'].set_color(text_color)
+    ax1.spines['bottom'].set_linewidth(1.5)
     
-    def init():
-        """Initialize the animation"""
-        # Setup first subplot (without pretraining)
-        ax1.set_facecolor('#f8fafc')
-        for i, (model, score) in enumerate(zip(models_without_pretrain, scores_without_pretrain)):
-            color = color_ours if 'Ours' in model else color_without
-            # Baselines at full height, VLA-0 starts at 0
-            initial_height = 0 if 'Ours' in model else score
-            bar = ax1.bar(x1[i], initial_height, width, color=color, alpha=0.9, 
-                         edgecolor='#334155', linewidth=2, zorder=3)
-            bars1.append(bar)
-            
-            # Add 3D shadow effect
-            shadow_offset = 0.03
-            shadow = Rectangle((x1[i] - width/2 + shadow_offset, shadow_offset), 
-                             width, initial_height if not 'Ours' in model else 0,
-                             facecolor='#cbd5e1', alpha=0.5 if not 'Ours' in model else 0, zorder=1,
-                             edgecolor='none')
-            ax1.add_patch(shadow)
-            
-            # Value text (show baselines, hide VLA-0 initially)
-            text_val = f'{score:.1f}' if not 'Ours' in model else ''
-            text = ax1.text(x1[i], initial_height + 1 if not 'Ours' in model else 0, text_val,
-                          ha='center', va='bottom', 
-                          fontsize=15, fontweight='bold', color=text_color, zorder=4)
-            value_texts1.append(text)
-        
-        # Add "SOTA" text annotation (invisible initially, no box visible)
-        ax1.sota_text = ax1.text(len(models_without_pretrain) - 1, 97, 'SOTA',
-                                ha='center', va='bottom',
-                                fontsize=18, fontweight='bold', color='white',
-                                alpha=0, zorder=5)
-        ax1.sota_box = None  # Will create when text appears
-        
-        # Horizontal line starts invisible, will appear at VLA-0's score
-        line1 = ax1.axhline(y=94.7, color='#64748b', linestyle='--', linewidth=3, 
-                           alpha=0, zorder=4)
-        ax1.baseline_line = line1
-        ax1.set_ylabel('Success Rate (%)', fontsize=19, fontweight='bold', color=text_color)
-        ax1.set_title('LIBERO: Models Without Large-Scale Action Pretraining', fontsize=18, 
-                     fontweight='600', pad=20, color=text_color)
-        ax1.set_xticks(x1)
-        ax1.set_xticklabels(models_without_pretrain, fontsize=14, rotation=0, color=text_color)
-        ax1.set_ylim(60, 100)
-        ax1.tick_params(axis='y', labelsize=17, colors=text_color)
-        ax1.tick_params(axis='x', labelsize=14, colors=text_color)
-        ax1.yaxis.grid(True, alpha=0.3, linestyle='-', linewidth=0.8, color='#cbd5e1', zorder=0)
-        ax1.set_axisbelow(True)
-        ax1.spines['top'].set_visible(False)
-        ax1.spines['right'].set_visible(False)
-        ax1.spines['left'].set_color(text_color)
-        ax1.spines['left'].set_linewidth(1.5)
-        ax1.spines['bottom'].set_color(text_color)
-        ax1.spines['bottom'].set_linewidth(1.5)
-        
-        # Setup second subplot (with pretraining) - starts invisible
-        ax2.set_facecolor('#f8fafc')
-        for i, (model, score) in enumerate(zip(models_with_pretrain, scores_with_pretrain)):
-            color = color_ours if 'Ours' in model else color_with
-            # Show baselines at full height, VLA-0 at 0, all invisible initially
-            initial_height = 0 if 'Ours' in model else score
-            bar = ax2.bar(x2[i], initial_height, width, color=color, alpha=0, 
-                         edgecolor='#334155', linewidth=2, zorder=3)
-            bars2.append(bar)
-            
-            # Add 3D shadow effect (invisible initially)
-            if not 'Ours' in model:
-                shadow_offset = 0.03
-                shadow = Rectangle((x2[i] - width/2 + shadow_offset, shadow_offset), 
-                                 width, initial_height,
-                                 facecolor='#cbd5e1', alpha=0, zorder=1,
-                                 edgecolor='none')
-                ax2.add_patch(shadow)
-            
-            text_content = f'{score:.1f}' if not 'Ours' in model else ''
-            text = ax2.text(x2[i], initial_height + 1 if not 'Ours' in model else 0, 
-                          text_content, ha='center', va='bottom', 
-                          fontsize=15, fontweight='bold', color=text_color, 
-                          alpha=0, zorder=4)
-            value_texts2.append(text)
-        
-        # Horizontal line starts invisible
-        line2 = ax2.axhline(y=94.7, color='#64748b', linestyle='--', linewidth=3, 
-                           alpha=0, zorder=4)
-        ax2.baseline_line = line2
-        
-        # Add annotation text (invisible initially) - position above VLA-0
-        vla0_index = len(models_with_pretrain) - 1  # VLA-0 is last
-        ax2.annotation_text = ax2.text(vla0_index, 97.5, 
-                                      'No Pretraining - Outperforms Most',
-                                      ha='center', va='bottom',
-                                      fontsize=19, fontweight='bold', color='white',
-                                      alpha=0, zorder=5)
-        ax2.annotation_box = None  # Will create when text appears
-        ax2.set_ylabel('Success Rate (%)', fontsize=19, fontweight='bold', color=text_color)
-        ax2.set_title('LIBERO: Models With Large-Scale Action Pretraining', fontsize=18, 
-                     fontweight='600', pad=20, color=text_color, alpha=0)
-        ax2.set_xticks(x2)
-        ax2.set_xticklabels(models_with_pretrain, fontsize=14, rotation=0, color=text_color)
-        for label in ax2.get_xticklabels():
-            label.set_alpha(0)
-        ax2.set_ylim(60, 100)
-        ax2.tick_params(axis='y', labelsize=17, colors=text_color)
-        for label in ax2.get_yticklabels():
-            label.set_alpha(0)
-        ax2.tick_params(axis='x', labelsize=14, colors=text_color)
-        ax2.yaxis.grid(True, alpha=0, linestyle='-', linewidth=0.8, color='#cbd5e1', zorder=0)
-        ax2.set_axisbelow(True)
-        ax2.spines['top'].set_visible(False)
-        ax2.spines['right'].set_visible(False)
-        ax2.spines['left'].set_color(text_color)
-        ax2.spines['left'].set_linewidth(1.5)
-        ax2.spines['left'].set_alpha(0)
-        ax2.spines['bottom'].set_color(text_color)
-        ax2.spines['bottom'].set_linewidth(1.5)
-        ax2.spines['bottom'].set_alpha(0)
-        
-        return bars1 + bars2 + value_texts1 + value_texts2
+    # Setup second subplot (with pretraining) - starts invisible
+    ax2.set_facecolor('#f8fafc')
+    # Show baselines at full height, VLA-0 at 0, all invisible initially
+    heights2 = np.where(is_ours2, 0, scores2)
+    bars2 = BarCollection(x2, heights2, width,
+                          facecolors=np.where(is_ours2, color_ours, color_with),
+                          alpha=0, edgecolors='#334155', linewidths=2, zorder=3)
+    ax2.add_collection(bars2)
     
-    def animate(frame):
-        """Slower sequence with more reading time"""
-        # 0-20: Plot 1 shows (baselines visible) - 1s
-        # 20-50: VLA-0 bar grows from 0 to 94.7 - 1.5s  
-        # 50-60: Horizontal line appears and blinks, "SOTA" text - 0.5s
-        # 60-100: Pause for reading SOTA - 2s (INCREASED)
-        # 100-120: Plot 1 fades to 30% opacity - 1s
-        # 120-130: Plot 2 baselines fade in - 0.5s
-        # 130-170: VLA-0 grows in plot 2 - 2s
-        # 170-180: Horizontal line and text blink - 0.5s
-        # 180-220: Pause for reading text - 2s
-        
-        if frame < 20:
-            # Plot 1 baselines visible, VLA-0 at 0 - just hold (1s)
-            pass
-        
-        elif frame < 50:
-            # VLA-0 bar grows in first plot
-            progress = min((frame - 20) / 30, 1.0)  # 1.5 seconds to grow
-            for i, model in enumerate(models_without_pretrain):
-                if 'Ours' in model:
-                    target_height = 94.7  # Explicitly set to 94.7
-                    current_height = target_height * progress
-                    bars1[i][0].set_height(current_height)
-                    
-                    # Update shadow
-                    shadow_idx = len(models_without_pretrain) + i
-                    if shadow_idx < len(ax1.patches):
-                        ax1.patches[shadow_idx].set_height(current_height)
-                        ax1.patches[shadow_idx].set_alpha(0.5 * progress)
-                    
-                    if progress > 0.5:
-                        value_texts1[i].set_text('94.7')
-                        value_texts1[i].set_y(current_height + 1)
-                        value_texts1[i].set_alpha((progress - 0.5) / 0.5)
-                    
-                    # Ensure final height is exactly 94.7 at frame 49
-                    if frame >= 49:
-                        bars1[i][0].set_height(94.7)
-        
-        elif frame < 60:
-            # Keep VLA-0 at 94.7 and show line/text with blink
-            for i, model in enumerate(models_without_pretrain):
-                if 'Ours' in model:
-                    bars1[i][0].set_height(94.7)
-            
-            # Horizontal line appears and blinks with "SOTA" text and box
-            line_progress = (frame - 50) / 10
-            blink = 0.5 + 0.5 * np.sin(line_progress * np.pi * 2)  # 1 full blink
-            ax1.baseline_line.set_alpha(blink * 0.9)
-            
-            # Make text visible with box
-            ax1.sota_text.set_alpha(blink)
-            ax1.sota_text.set_color(color_ours)
-            ax1.sota_text.set_bbox(dict(boxstyle='round,pad=0.5', facecolor='white',
-                                        edgecolor=color_ours, linewidth=2.5, alpha=blink))
-        
-        elif frame < 100:
-            # Pause - keep SOTA text and line visible, ensure bar at 94.7
-            for i, model in enumerate(models_without_pretrain):
-                if 'Ours' in model:
-                    bars1[i][0].set_height(94.7)
-            # Keep SOTA visible
-            ax1.baseline_line.set_alpha(0.9)
-            ax1.sota_text.set_alpha(1.0)
-        
-        elif frame < 120:
-            # Fade plot 1 to 30% opacity
-            fade_progress = (frame - 100) / 20
-            for i, bar in enumerate(bars1):
-                bars1[i][0].set_alpha(0.9 - fade_progress * 0.6)
-                value_texts1[i].set_alpha(1.0 - fade_progress * 0.7)
-            ax1.baseline_line.set_alpha(0.9 - fade_progress * 0.6)
-            ax1.sota_text.set_alpha(1.0 - fade_progress)
-        
-        elif frame < 130:
-            # Fade in plot 2 baselines
-            fade_progress = (frame - 120) / 10
-            ax2.title.set_alpha(fade_progress)
-            for label in ax2.get_xticklabels():
-                label.set_alpha(fade_progress)
-            for label in ax2.get_yticklabels():
-                label.set_alpha(fade_progress)
-            ax2.spines['left'].set_alpha(fade_progress)
-            ax2.spines['bottom'].set_alpha(fade_progress)
-            ax2.yaxis.grid(True, alpha=fade_progress * 0.3)
-            
-            for i, model in enumerate(models_with_pretrain):
-                if not 'Ours' in model:
-                    bars2[i][0].set_alpha(fade_progress * 0.9)
-                    value_texts2[i].set_alpha(fade_progress)
-                    # Fade in shadow
-                    shadow_idx = len(bars2) + [j for j, m in enumerate(models_with_pretrain) if not 'Ours' in m].index(i)
-                    if shadow_idx < len(ax2.patches):
-                        ax2.patches[shadow_idx].set_alpha(fade_progress * 0.5)
-        
-        elif frame < 170:
-            # VLA-0 grows in second plot (slower - 2 seconds)
-            progress = min((frame - 130) / 40, 1.0)  # 2 seconds to grow
-            for i, model in enumerate(models_with_pretrain):
-                if 'Ours' in model:
-                    target_height = 94.7  # Explicitly set to 94.7
-                    current_height = target_height * progress
-                    bars2[i][0].set_height(current_height)
-                    bars2[i][0].set_alpha(0.9)
-                    
-                    if progress > 0.5:
-                        value_texts2[i].set_text('94.7')
-                        value_texts2[i].set_y(current_height + 1)
-                        value_texts2[i].set_alpha((progress - 0.5) / 0.5)
-                    
-                    # Ensure final height is exactly 94.7 at frame 169
-                    if frame >= 169:
-                        bars2[i][0].set_height(94.7)
-        
-        elif frame < 180:
-            # Keep VLA-0 at 94.7 and show line/text with blink
-            for i, model in enumerate(models_with_pretrain):
-                if 'Ours' in model:
-                    bars2[i][0].set_height(94.7)
-            
-            # Horizontal line and text appear with blink
-            line_progress = (frame - 170) / 10
-            blink = 0.5 + 0.5 * np.sin(line_progress * np.pi * 2)  # 1 full blink
-            ax2.baseline_line.set_alpha(blink * 0.9)
-            
-            # Make text visible with box
-            ax2.annotation_text.set_alpha(blink)
-            ax2.annotation_text.set_color(color_ours)
-            ax2.annotation_text.set_bbox(dict(boxstyle='round,pad=0.6', facecolor='white',
-                                             edgecolor=color_ours, linewidth=2.5, alpha=blink))
-        
-        elif frame >= 180:
-            # Pause - keep everything visible for reading
-            # Fade plot 1 back to full opacity
-            fade_back_progress = min((frame - 180) / 20, 1.0)  # 1 second to fade back
-            for i, bar in enumerate(bars1):
-                bars1[i][0].set_alpha(0.3 + fade_back_progress * 0.6)
-                value_texts1[i].set_alpha(0.3 + fade_back_progress * 0.7)
-            ax1.baseline_line.set_alpha(0.3 + fade_back_progress * 0.6)
-            
-            # Keep plot 2 visible
-            for i, model in enumerate(models_with_pretrain):
-                if 'Ours' in model:
-                    bars2[i][0].set_height(94.7)
-            ax2.baseline_line.set_alpha(0.9)
-            ax2.annotation_text.set_alpha(1.0)
-        
-        return bars1 + bars2 + value_texts1 + value_texts2
+    # Add 3D shadow effect to the baselines (invisible initially)
+    shadows2 = BarCollection(x2[~is_ours2] + shadow_offset, heights2[~is_ours2], width,
+                             bottom=shadow_offset, facecolors='#cbd5e1', alpha=0, zorder=1,
+                             edgecolors='none')
+    ax2.add_collection(shadows2)
     
-    # Create animation
-    anim = FuncAnimation(fig, animate, init_func=init, frames=n_frames, 
-                        interval=50, blit=False, repeat=True)
+    value_texts2 = LabelCollection(x2, heights2 + 1, [f'{score:.1f}' for score in scores2],
+                                   ha='center', va='bottom',
+                                   fontsize=15, fontweight='bold', color=text_color,
+                                   alpha=0, zorder=4)
+    ax2.add_artist(value_texts2)
     
-    # Save as MP4
-    writer = FFMpegWriter(fps=20, bitrate=2000, 
-                         extra_args=['-pix_fmt', 'yuv420p', '-vcodec', 'libx264'])
+    # Horizontal line starts invisible
+    line2 = ax2.axhline(y=ours_score, color='#64748b', linestyle='--', linewidth=3, 
+                       alpha=0, zorder=4)
+    ax2.baseline_line = line2
+    
+    # Add annotation text with its box (invisible initially) - position above VLA-0
+    ours2 = int(np.flatnonzero(is_ours2)[0])
+    ax2.annotation_text = ax2.text(ours2, 97.5, 
+                                  'No Pretraining - Outperforms Most',
+                                  ha='center', va='bottom',
+                                  fontsize=19, fontweight='bold', color=color_ours,
+                                  alpha=0, zorder=5,
+                                  bbox=dict(boxstyle='round,pad=0.6', facecolor='white',
+                                            edgecolor=color_ours, linewidth=2.5, alpha=0))
+    ax2.set_ylabel('Success Rate (%)', fontsize=19, fontweight='bold', color=text_color)
+    ax2.set_title('LIBERO: Models With Large-Scale Action Pretraining', fontsize=18, 
+                 fontweight='600', pad=20, color=text_color, alpha=0)
+    ax2.set_xticks(x2)
+    ax2.set_xticklabels(models_with_pretrain, fontsize=14, rotation=0, color=text_color)
+    ax2.set_ylim(60, 100)
+    ax2.tick_params(axis='y', labelsize=17, colors=text_color)
+    ax2.tick_params(axis='x', labelsize=14, colors=text_color)
+    ax2.yaxis.grid(True, alpha=0, linestyle='-', linewidth=0.8, color='#cbd5e1', zorder=0)
+    ax2.set_axisbelow(True)
+    ax2.spines['top'].set_visible(False)
+    ax2.spines['right'].set_visible(False)
+    ax2.spines['left'].set_color(text_color)
+    ax2.spines['left'].set_linewidth(1.5)
+    ax2.spines['bottom'].set_color(text_color)
+    ax2.spines['bottom'].set_linewidth(1.5)
+    
+    # Handles for the timeline
+    ax1.bars, ax1.shadows, ax1.value_texts = bars1, shadows1, value_texts1
+    ax2.bars, ax2.shadows, ax2.value_texts = bars2, shadows2, value_texts2
+    ax1.ours, ax2.ours = ours1, ours2
+    ax1.is_ours, ax2.is_ours = is_ours1, is_ours2
+    ax1.scores, ax2.scores = scores1, scores2
+    ax1.ours_score = ours_score
+    ax2.ours_score = scores_with_pretrain[ours2]
+    
+    timeline = Timeline(PHASES, fps=fps, duration=duration)
+    declare_timeline(timeline, ax1, ax2)
+    timeline.apply(0)
+    return fig, timeline
+
+
+def declare_timeline(timeline, ax1, ax2):
+    """Declare the motion: one array per artist property, indexed by frame
+
+    Bars, shadows and value labels are collections, so their tracks hold
+    one column per bar and each frame updates a whole plot in one call.
+    """
+    kf = timeline.keyframes
+    is_ours1, is_ours2 = ax1.is_ours, ax2.is_ours
+    
+    # Plot 1: VLA-0 grows, line and "SOTA" blink, whole plot fades and comes back
+    height1 = kf(np.where(is_ours1, 0, ax1.scores), ('grow1', ax1.scores))
+    timeline.add(ax1.bars, BarCollection.set_heights, height1)
+    timeline.add(ax1.shadows, BarCollection.set_heights, height1)
+    timeline.add(ax1.shadows, 'set_alpha', kf(np.where(is_ours1, 0, 0.5), ('grow1', 0.5)))
+    timeline.add(ax1.value_texts, LabelCollection.set_ys, height1 + 1)
+    timeline.add(ax1.value_texts, LabelCollection.set_alphas,
+                 kf(np.where(is_ours1, 0, 1.0), ('grow1', 1.0, second_half),
+                    ('fade1', 0.3), ('restore1', 1.0)))
+    timeline.add(ax1.bars, 'set_alpha', kf(0.9, ('fade1', 0.3), ('restore1', 0.9)))
+    timeline.add(ax1.baseline_line, 'set_alpha',
+                 kf(0, ('blink1', 0.9, blink), ('fade1', 0.3), ('restore1', 0.9)))
+    timeline.add(ax1.sota_text, 'set_alpha', kf(0, ('blink1', 1.0, blink), ('fade1', 0)))
+    timeline.add(ax1.sota_text, set_bbox_alpha,
+                 kf(0, ('blink1', BOX_ALPHA, blink), ('fade1', 0)))
+    
+    # Plot 2: axes and baselines fade in, VLA-0 grows, line and annotation blink
+    fade_in2 = kf(0, ('fadein2', 1.0))
+    timeline.add([ax2.title, ax2.spines['left'], ax2.spines['bottom']], 'set_alpha', fade_in2)
+    # Tick labels and grid lines are drawn by their Axis
+    timeline.add([ax2.xaxis, ax2.yaxis], set_ticklabel_alpha, fade_in2)
+    timeline.add(ax2.yaxis, set_grid_alpha, fade_in2 * 0.3)
+    # Baselines fade in with the axes, VLA-0 appears as it starts growing
+    timeline.add(ax2.bars, 'set_alpha',
+                 np.where(is_ours2, kf(0, ('fadein2', 0.9, step))[:, None],
+                          fade_in2[:, None] * 0.9))
+    timeline.add(ax2.shadows, 'set_alpha', fade_in2 * 0.5)
+    height2 = kf(np.where(is_ours2, 0, ax2.scores), ('grow2', ax2.scores))
+    timeline.add(ax2.bars, BarCollection.set_heights, height2)
+    timeline.add(ax2.value_texts, LabelCollection.set_ys, height2 + 1)
+    timeline.add(ax2.value_texts, LabelCollection.set_alphas,
+                 np.where(is_ours2, kf(0, ('grow2', 1.0, second_half))[:, None],
+                          fade_in2[:, None]))
+    timeline.add(ax2.baseline_line, 'set_alpha', kf(0, ('blink2', 0.9, blink)))
+    timeline.add(ax2.annotation_text, 'set_alpha', kf(0, ('blink2', 1.0, blink)))
+    timeline.add(ax2.annotation_text, set_bbox_alpha, kf(0, ('blink2', BOX_ALPHA, blink)))
+
+
+def preview_frame(frame, output_path, fps=FPS, duration=None, dpi=DPI):
+    """Render a single frame to an image, without playing the frames before it"""
+    fig, timeline = build_animation(fps, duration, dpi)
+    if not 0 <= frame < timeline.n_frames:
+        plt.close(fig)
+        raise ValueError(f"Frame {frame} is outside the animation (0-{timeline.n_frames - 1})")
+    timeline.apply(frame)
+    fig.savefig(output_path, facecolor=fig.get_facecolor())
+    plt.close(fig)
+    print(f"Frame {frame} saved: {output_path}")
+
+
+def create_animated_plot(output_path=OUTPUT_PATH, blit=False, jobs=1, fps=FPS, duration=None,
+                         dpi=DPI, cache_dir=CACHE_DIR, profile=None, vfr=True, composite=False,
+                         **encoder):
+    """Render the animation to ``output_path``
+
+    With ``blit=True`` only the artists touched by each frame are redrawn
+    on top of a cached background instead of re-rendering the whole figure.
+    With ``jobs > 1`` frames are rendered in that many worker processes.
+    Frames identical to the one before (holds) are never rendered: with
+    ``vfr=True`` each hold is encoded once as a longer frame, otherwise the
+    previous frame is written again at the constant frame rate.
+    With ``composite=True`` frames are blended with NumPy from layers
+    rasterized once (see ``FrameCompositor``), in this process and without
+    the frame cache; ``blit`` and ``jobs`` don't apply.
+    ``encoder`` options (codec, crf, preset, pix_fmt, bitrate) are passed
+    to ``RawVideoWriter``. A ``.gif`` or ``.webp`` ``output_path`` makes an
+    animated image instead, on one palette taken from a sample of frames
+    (``animated_image.py``); ``encoder`` options don't apply to it.
+
+    Unless ``cache_dir`` is None, an unchanged video is copied from the
+    build cache, and otherwise only frames whose content changed are drawn.
+
+    ``profile`` is a path to save a Chrome trace of every frame's update,
+    draw, grab, cache and write times to; a per-phase summary is printed.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    fig, timeline = build_animation(fps, duration, dpi)
+    image_writer = IMAGE_WRITERS.get(os.path.splitext(output_path)[1].lower())
+    cache = keys = None
+    if cache_dir:
+        cache = BuildCache(cache_dir)
+        keys = frame_keys(fig, timeline, dpi)
+        # Composited frames are approximate, so their code is part of the video's key
+        compositor = (source_of(FrameCompositor, Layer, blend, layered_artists, save_composited)
+                      if composite else None)
+        writer_code = (source_of(RawVideoWriter, image_writer, PaletteMapper, global_palette,
+                                 animation_palette) if image_writer else source_of(RawVideoWriter))
+        output_key = content_key(keys, fps, vfr, compositor, writer_code, encoder,
+                                 os.path.splitext(output_path)[1])
+        if cache.fetch(output_key, output_path):
+            plt.close(fig)
+            print(f"\nUp to date (from cache): {output_path}")
+            return
+    frames, holds = distinct_frames(timeline)
+    print(f"Rendering {len(frames)} of {timeline.n_frames} frames "
+          f"(the rest repeat the frame before)")
+    repeats = np.ones_like(holds) if vfr else holds
+    size = fig.canvas.get_width_height()
+    if image_writer:
+        writer = image_writer(output_path, size, animation_palette(fig, timeline, frames),
+                              fps=fps, durations=holds if vfr else None)
+    else:
+        writer = RawVideoWriter(output_path, size, fps=fps, durations=holds if vfr else None,
+                                **encoder)
+    profiler = FrameProfiler(timeline.phase_of) if profile else NO_PROFILER
     
-    output_path = '/Users/angoyal/Documents/code/simplevla_webpage/Videos/libero_results.mp4'
-    anim.save(output_path, writer=writer)
+    if composite:
+        save_composited(fig, timeline, writer, frames, repeats, profiler=profiler)
+    elif jobs > 1:
+        save_parallel(timeline, writer, jobs, frames, repeats, blit=blit, duration=duration,
+                      dpi=dpi, cache_dir=cache_dir,
+                      max_buffered_frames=max(1, MAX_BUFFERED_BYTES // (4 * size[0] * size[1])),
+                      profiler=profiler)
+    else:
+        save_frames(fig, timeline, writer, frames, repeats, blit=blit, cache=cache, keys=keys,
+                    profiler=profiler)
     print(f"\nAnimation saved: {output_path}")
+    if profile:
+        profiler.write_trace(profile)
+        print(f"\n{profiler.format_summary()}\n\nTrace saved: {profile}")
     
+    if cache:
+        cache.store(output_key, output_path)
+        cache.evict()
     plt.close()
 
-if __name__ == "__main__":
-    print("Creating LIBERO results animation...")
-    print("This will take ~30 seconds...")
-    create_animated_plot()
-    print("\n✅ Done! Check Videos/libero_results.mp4")
 
+def read_checkpoints(path):
+    """Yield ``(step, score)`` from a JSONL eval log, one line at a time
+
+    Each line is a JSON object with the checkpoint's training ``step`` and
+    its success rate ``score`` in percent, e.g. ``{"step": 5000, "score": 81.2}``.
+    A log still being written by a training run can end in a partial line:
+    an unparseable last line is skipped with a warning, any other is an error.
+    """
+    bad_line = None
+    with open(path) as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            if bad_line:
+                raise ValueError(bad_line)
+            try:
+                record = json.loads(line)
+                checkpoint = float(record['step']), float(record['score'])
+            except (ValueError, KeyError, TypeError) as error:
+                bad_line = (f"{path}:{number}: expected {{\"step\": ..., \"score\": ...}} "
+                            f"({error})")
+                continue
+            yield checkpoint
+    if bad_line:
+        print(f"Warning: skipped an unfinished last line: {bad_line}", file=sys.stderr)
+
+
+def rank_positions(scores):
+    """Bar slot of every score, lowest on the left; ties keep their order"""
+    order = np.argsort(scores, axis=-1, kind='stable')
+    positions = np.empty(order.shape)
+    np.put_along_axis(positions, order, np.arange(scores.shape[-1], dtype=float), axis=-1)
+    return positions
+
+
+def race_segments(checkpoints, baselines, frames_per_checkpoint, hold_frames):
+    """Yield ``(steps, heights, positions)`` arrays for each run of frames
+
+    One run per transition between consecutive checkpoints, plus the first
+    frame and the final hold. Scores, bar positions and the step counter
+    are eased for all frames of a transition at once, with our bar in the
+    last column; only the previous checkpoint is kept, so a log of any
+    length is rendered in constant memory.
+    """
+    checkpoints = iter(checkpoints)
+    try:
+        step, score = next(checkpoints)
+    except StopIteration:
+        raise ValueError("The eval log has no checkpoints") from None
+    baselines = np.asarray(baselines, dtype=float)
+    scores = np.append(baselines, score)
+    positions = rank_positions(scores)
+    yield np.array([step]), scores[None], positions[None]
+    t = np.arange(1, frames_per_checkpoint + 1) / frames_per_checkpoint
+    eased = ease_in_out(t)[:, None]
+    for next_step, next_score in checkpoints:
+        next_scores = np.append(baselines, next_score)
+        next_positions = rank_positions(next_scores)
+        yield (step + (next_step - step) * t,
+               scores + (next_scores - scores) * eased,
+               positions + (next_positions - positions) * eased)
+        step, scores, positions = next_step, next_scores, next_positions
+    yield (np.full(hold_frames, step), np.broadcast_to(scores, (hold_frames, len(scores))),
+           np.broadcast_to(positions, (hold_frames, len(scores))))
+
+
+def build_race(baselines=RACE_BASELINES, model=RACE_MODEL, dpi=DPI):
+    """Lay out the bar race; returns ``(fig, pose)``
+
+    ``pose(step, heights, positions)`` moves every bar, its shadow, value
+    and name to one frame's state and returns the artists it changed.
+    """
+    names = [name for name, _ in baselines] + [model]
+    n = len(names)
+    is_ours = np.arange(n) == n - 1
+    width = 0.6
+    shadow_offset = 0.03
+
+    fig, ax = plt.subplots(figsize=(16, 7), dpi=dpi)
+    fig.patch.set_facecolor(bg_color)
+    fig.subplots_adjust(bottom=0.15)
+    ax.set_facecolor('#f8fafc')
+    x = np.arange(n, dtype=float)
+    bars = BarCollection(x, 0, width, facecolors=np.where(is_ours, color_ours, color_with),
+                         alpha=0.9, edgecolors='#334155', linewidths=2, zorder=3)
+    ax.add_collection(bars)
+    shadows = BarCollection(x + shadow_offset, 0, width, bottom=shadow_offset,
+                            facecolors='#cbd5e1', alpha=0.5, zorder=1, edgecolors='none')
+    ax.add_collection(shadows)
+    values = LabelCollection(x, 1, [''] * n, ha='center', va='bottom', fontsize=15,
+                             fontweight='bold', color=text_color, zorder=4)
+    ax.add_artist(values)
+    # Model names follow their bars, just below the axis
+    labels = LabelCollection(x, -0.02, names, ha='center', va='top', fontsize=14,
+                             color=text_color, transform=ax.get_xaxis_transform())
+    ax.add_artist(labels)
+    counter = ax.text(0.01, 0.97, '', transform=ax.transAxes, ha='left', va='top',
+                      fontsize=18, fontweight='bold', color=color_ours, zorder=5)
+
+    ax.set_title('LIBERO: VLA-0 Checkpoints vs. Models With Large-Scale Action Pretraining',
+                 fontsize=18, fontweight='600', pad=20, color=text_color)
+    ax.set_ylabel('Success Rate (%)', fontsize=19, fontweight='bold', color=text_color)
+    ax.set_xlim(-0.6, n - 0.4)
+    ax.set_ylim(0, 105)
+    ax.set_xticks([])
+    ax.tick_params(axis='y', labelsize=17, colors=text_color)
+    ax.yaxis.grid(True, alpha=0.3, linestyle='-', linewidth=0.8, color='#cbd5e1', zorder=0)
+    ax.set_axisbelow(True)
+    for side in ('top', 'right'):
+        ax.spines[side].set_visible(False)
+    for side in ('left', 'bottom'):
+        ax.spines[side].set_color(text_color)
+        ax.spines[side].set_linewidth(1.5)
+
+    def pose(step, heights, positions):
+        bars.set_positions(positions)
+        bars.set_heights(heights)
+        shadows.set_positions(positions + shadow_offset)
+        shadows.set_heights(heights)
+        values.set_positions(positions, heights + 1)
+        values.set_texts([f'{score:.1f}' for score in heights])
+        labels.set_positions(positions)
+        counter.set_text(f'Step {step:,.0f}')
+        return [bars, shadows, values, labels, counter]
+
+    return fig, pose
+
+
+def create_bar_race(log_path, output_path, fps=FPS, dpi=DPI,
+                    checkpoint_seconds=RACE_CHECKPOINT_SECONDS, hold_seconds=RACE_HOLD_SECONDS,
+                    cache_dir=CACHE_DIR, **encoder):
+    """Render a bar race of the checkpoints in ``log_path`` to ``output_path``
+
+    Frames are computed a transition at a time while the log is read and
+    streamed straight to the encoder over a background captured once, so
+    memory doesn't grow with the number of checkpoints. ``encoder`` options
+    are passed to ``RawVideoWriter``; the video has a constant frame rate.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    frames_per_checkpoint = max(round(checkpoint_seconds * fps), 1)
+    hold_frames = max(round(hold_seconds * fps), 1)
+    cache = None
+    if cache_dir:
+        cache = BuildCache(cache_dir)
+        output_key = content_key(
+            'libero_race', file_digest(log_path),
+            source_of(read_checkpoints, rank_positions, race_segments, build_race,
+                      BarCollection, LabelCollection, RawVideoWriter),
+            RACE_BASELINES, RACE_MODEL, [color_with, color_ours, bg_color, text_color],
+            render_settings(), fps, dpi, frames_per_checkpoint, hold_frames, encoder,
+            os.path.splitext(output_path)[1])
+        if cache.fetch(output_key, output_path):
+            print(f"\nUp to date (from cache): {output_path}")
+            return
+
+    fig, pose = build_race(dpi=dpi)
+    segments = race_segments(read_checkpoints(log_path), [score for _, score in RACE_BASELINES],
+                             frames_per_checkpoint, hold_frames)
+    writer = RawVideoWriter(output_path, fig.canvas.get_width_height(), fps=fps, **encoder)
+    n_frames = 0
+    try:
+        # Everything but the race itself is static: capture it once
+        first = next(segments)
+        dirty = set(pose(first[0][0], first[1][0], first[2][0]))
+        animated = draw_order(fig, dirty | stacked_above(fig, dirty))
+        background = capture_background(fig, animated)
+        with writer:
+            for steps, heights, positions in itertools.chain([first], segments):
+                for i in range(len(steps)):
+                    pose(steps[i], heights[i], positions[i])
+                    blit_frame(fig, background, animated)
+                    writer.write_frame(fig.canvas.buffer_rgba())
+                n_frames += len(steps)
+    finally:
+        plt.close(fig)
+    print(f"\nBar race saved: {output_path} ({n_frames} frames)")
+    if cache:
+        cache.store(output_key, output_path)
+        cache.evict()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render the LIBERO results animation")
+    parser.add_argument('--output', help="Output path: .mp4, or .gif / .webp for an animated "
+                                         "image (default: Videos/libero_results.mp4, or "
+                                         "Videos/libero_race.mp4 with --race)")
+    parser.add_argument('--blit', action='store_true',
+                        help="Redraw only changed artists over a cached background (faster)")
+    parser.add_argument('--jobs', type=int, default=1,
+                        help="Render frames in this many worker processes")
+    parser.add_argument('--fps', type=int, default=FPS, help="Frames per second")
+    parser.add_argument('--duration', type=float,
+                        help="Stretch or squeeze the timeline to this many seconds")
+    parser.add_argument('--dpi', type=int, default=DPI,
+                        help="Frame resolution: 16x11 inches at this dpi (240 for 4K)")
+    parser.add_argument('--preview', type=int, metavar='FRAME',
+                        help="Only render this frame to a PNG next to --output")
+    parser.add_argument('--codec', default='libx264', help="ffmpeg video codec")
+    parser.add_argument('--crf', type=int,
+                        help="Constant quality (e.g. 23); overrides --bitrate")
+    parser.add_argument('--bitrate', type=int, default=2000, help="Target bitrate in kbps")
+    parser.add_argument('--preset', help="Encoder preset, e.g. fast or slow")
+    parser.add_argument('--pix-fmt', default='yuv420p', help="Output pixel format")
+    parser.add_argument('--cfr', action='store_true',
+                        help="Constant frame rate: encode holds as repeated frames "
+                             "instead of longer ones")
+    parser.add_argument('--composite', action='store_true',
+                        help="Blend frames with NumPy from layers rasterized once "
+                             "(fastest; near-identical pixels)")
+    parser.add_argument('--race', metavar='LOG',
+                        help="Instead, render a bar race of the checkpoints in this JSONL eval "
+                             "log ({\"step\": ..., \"score\": ...} per line)")
+    parser.add_argument('--checkpoint-seconds', type=float, default=RACE_CHECKPOINT_SECONDS,
+                        help="Bar race: seconds per checkpoint transition")
+    parser.add_argument('--profile', metavar='TRACE',
+                        help="Time every frame's stages; save a Chrome trace JSON here")
+    parser.add_argument('--cache-dir', default=CACHE_DIR, help="Build cache location")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Render everything from scratch and don't touch the cache")
+    args = parser.parse_args(argv)
+    if args.output is None:
+        args.output = RACE_OUTPUT_PATH if args.race else OUTPUT_PATH
+    if not args.race:
+        try:
+            n_frames = Timeline(PHASES, fps=args.fps, duration=args.duration).n_frames
+        except ValueError as error:
+            parser.error(str(error))
+
+    if args.race:
+        if os.path.splitext(args.output)[1].lower() in IMAGE_WRITERS:
+            parser.error("--race streams its frames, so it only writes video (e.g. .mp4)")
+        try:
+            create_bar_race(args.race, args.output, fps=args.fps, dpi=args.dpi,
+                            checkpoint_seconds=args.checkpoint_seconds,
+                            codec=args.codec, crf=args.crf, bitrate=args.bitrate,
+                            preset=args.preset, pix_fmt=args.pix_fmt,
+                            cache_dir=None if args.no_cache else args.cache_dir)
+        except ValueError as error:
+            # A bad eval log; the video writer has left no partial output
+            parser.error(str(error))
+        print(f"\n✅ Done! Check {args.output}")
+    elif args.preview is not None:
+        if not 0 <= args.preview < n_frames:
+            parser.error(f"--preview must be a frame within 0-{n_frames - 1}")
+        path = os.path.splitext(args.output)[0] + f'_frame{args.preview:03d}.png'
+        preview_frame(args.preview, path, fps=args.fps, duration=args.duration, dpi=args.dpi)
+    else:
+        print("Creating LIBERO results animation...")
+        print("This will take ~30 seconds...")
+        create_animated_plot(args.output, blit=args.blit, jobs=args.jobs,
+                             fps=args.fps, duration=args.duration, dpi=args.dpi,
+                             codec=args.codec, crf=args.crf, bitrate=args.bitrate,
+                             preset=args.preset, pix_fmt=args.pix_fmt, profile=args.profile,
+                             vfr=not args.cfr, composite=args.composite,
+                             cache_dir=None if args.no_cache else args.cache_dir)
+        print(f"\n✅ Done! Check {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,25 @@
-import matplotlib.pyplot as plt
+import argparse
+import csv
+import json
+import os
+import re
+from collections import OrderedDict
+
 import numpy as np
-import seaborn as sns
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 from matplotlib.patches import Rectangle
 
-# Fix Type 3 font issue - use TrueType fonts instead
-import matplotlib
-matplotlib.rcParams['pdf.fonttype'] = 42  # TrueType fonts
-matplotlib.rcParams['ps.fonttype'] = 42   # TrueType fonts for EPS
+from bar_collections import BarCollection, LabelCollection
+from build_cache import CACHE_DIR, BuildCache, content_key, render_settings, source_of
+from figure_export import export_figure, parse_exports, tight_bbox
+from paths import SITE_ROOT
+from plot_style import apply_style
 
-# Set seaborn style
-sns.set_style("whitegrid")
+# Whitegrid style, TrueType fonts in PDFs, Helvetica when it's installed
+apply_style()
 
-# Use Helvetica font
-plt.rcParams['font.family'] = 'Helvetica'
+OUTPUT_DIR = os.path.join(SITE_ROOT, 'data', 'figures')
 
 # Data from the table
 models_without_pretrain = [
@@ -44,46 +51,43 @@ color_without = '#7FD87F'  # Green
 color_with = '#6BAED6'     # Blue
 color_ours = '#FF9800'     # Orange for "Ours"
 
-def create_plot(models, scores, base_color, title, filename, add_hatching=False):
-    fig, ax = plt.subplots(figsize=(14, 4))
+def layout_plot(n_bars):
+    """Lay out a chart with ``n_bars`` empty bars
+
+    Everything that only depends on the number of bars is set up once here;
+    ``update_plot`` fills in a table, so the same figure can be reused for
+    any table of that size. The figure is not registered with pyplot, so it
+    is freed as soon as it is dropped.
+    """
+    fig = Figure(figsize=(14, 4))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
     
-    x = np.arange(len(models))
+    x = np.arange(n_bars)
     width = 0.6
     
-    # Create bars individually to control colors
-    bars = []
-    for i, (model, score) in enumerate(zip(models, scores)):
-        color = color_ours if 'Ours' in model else base_color
-        alpha = 0.9 if 'Ours' in model else 0.85
-        # Add hatching to "Ours" if requested (for second plot)
-        hatch = '///' if (add_hatching and 'Ours' in model) else None
-        bar = ax.bar(x[i], score, width,
-                     color=color, alpha=alpha, 
-                     edgecolor='black', linewidth=0.7,
-                     hatch=hatch,
-                     zorder=3)
-        bars.extend(bar)
+    # All bars in one collection; colors and alphas are set per table
+    ax.bars = BarCollection(x, 0, width, edgecolors='black', linewidths=0.7, zorder=3)
+    ax.add_collection(ax.bars)
+    # Hatching goes on top of the "Ours" bar, so the collection can stay unhatched
+    ax.hatch = Rectangle((0, 0), width, 0, facecolor='none', edgecolor='black', linewidth=0,
+                         hatch='///', zorder=3, visible=False)
+    ax.add_patch(ax.hatch)
     
     # Add subtle shadow effect to bars
     shadow_offset = 0.04
-    for bar in bars:
-        shadow = Rectangle((bar.get_x() + shadow_offset, shadow_offset), 
-                           bar.get_width(), bar.get_height(),
-                           facecolor='gray', alpha=0.3, zorder=1,
-                           edgecolor='none')
-        ax.add_patch(shadow)
+    ax.shadows = BarCollection(x + shadow_offset, 0, width, bottom=shadow_offset,
+                               facecolors='gray', alpha=0.3, zorder=1, edgecolors='none')
+    ax.add_collection(ax.shadows)
     
-    # Add dotted horizontal line at VLA-0's score (94.7)
-    ax.axhline(y=94.7, color='#FF6B6B', linestyle='--', linewidth=2, alpha=0.7, zorder=2,
-               label='VLA-0 baseline')
+    # Add dotted horizontal line at VLA-0's score
+    ax.baseline_line = ax.axhline(y=94.7, color='#FF6B6B', linestyle='--', linewidth=2,
+                                  alpha=0.7, zorder=2, label='VLA-0 baseline')
     
     ax.set_ylabel('Average Success Rate (%)', fontsize=19, fontweight='bold')
     ax.set_xlabel('Models', fontsize=19, fontweight='bold')
-    ax.set_title(title, fontsize=20, fontweight='bold', pad=15)
+    ax.set_title('', fontsize=20, fontweight='bold', pad=15)
     ax.set_xticks(x)
-    ax.set_xticklabels(models, fontsize=16, rotation=0, ha='center')
-    
-    ax.set_ylim(60, 100)
     
     # Enhanced grid styling
     ax.yaxis.grid(True, alpha=0.2, linestyle='-', linewidth=0.7, color='#CCCCCC', zorder=0)
@@ -91,37 +95,283 @@ def create_plot(models, scores, base_color, title, filename, add_hatching=False)
     ax.tick_params(axis='y', labelsize=18)
     ax.tick_params(axis='x', labelsize=16)
     
-    # Add value labels on bars
-    for i, bar in enumerate(bars):
-        height = bar.get_height()
-        ax.text(bar.get_x() + bar.get_width()/2., height + 1, 
-               f'{height:.1f}', 
-               ha='center', va='bottom', fontsize=15, fontweight='bold', zorder=4)
-        
-        # Add annotation for SimpleVLA in second plot (with hatching)
-        if add_hatching and 'Ours' in models[i]:
-            ax.text(bar.get_x() + bar.get_width()/2., height - 4, 
-                   'No large-scale\naction pretrain', 
-                   ha='center', va='top', fontsize=11, style='italic',
-                   bbox=dict(boxstyle='round,pad=0.4', facecolor='white', 
-                            edgecolor='#FF9800', linewidth=1.5, alpha=0.9),
-                   zorder=5)
+    # Value labels on bars
+    ax.value_texts = LabelCollection(x, 0, [''] * n_bars,
+                                     ha='center', va='bottom', fontsize=15, fontweight='bold',
+                                     zorder=4)
+    ax.add_artist(ax.value_texts)
     
-    plt.tight_layout()
-    plt.savefig(f'/Users/angoyal/Downloads/{filename}', dpi=300, bbox_inches='tight', facecolor='white')
-    print(f"Saved: {filename}")
-
-# Create Plot 1: Without Large-scale Action Pretraining
-create_plot(models_without_pretrain, scores_without_pretrain, color_without,
-            'Models Without Large-scale Action Pretraining',
-            'libero_without_pretraining.pdf', add_hatching=False)
-
-# Create Plot 2: With Large-scale Action Pretraining (add hatching to SimpleVLA)
-create_plot(models_with_pretrain, scores_with_pretrain, color_with,
-            'Models With Large-scale Action Pretraining',
-            'libero_with_pretraining.pdf', add_hatching=True)
-
-print("\nBoth plots created successfully!")
-print("Files:")
-print("  - libero_without_pretraining.pdf")
-print("  - libero_with_pretraining.pdf")
\ No newline at end of file
+    # Annotation for VLA-0 in the pretraining plot (with hatching)
+    ax.annotation_text = ax.text(0, 0, 'No large-scale\naction pretrain', 
+                                 ha='center', va='top', fontsize=11, style='italic',
+                                 bbox=dict(boxstyle='round,pad=0.4', facecolor='white', 
+                                           edgecolor='#FF9800', linewidth=1.5, alpha=0.9),
+                                 zorder=5, visible=False)
+    return fig, ax
+
+
+def update_plot(ax, models, scores, base_color, title, add_hatching=False):
+    """Fill a laid-out chart with one table, updating its artists in place"""
+    ax.title.set_text(title)
+    ax.set_xticklabels(models, fontsize=16, rotation=0, ha='center')
+    # Keep the usual 60-100 range unless a table has lower scores
+    ax.set_ylim(min(60, 10 * np.floor((min(scores) - 5) / 10)), 100)
+    
+    scores = np.asarray(scores, dtype=float)
+    ours = np.array(['Ours' in model for model in models])
+    ax.bars.set_heights(scores)
+    ax.bars.set_facecolor([color_ours if is_ours else base_color for is_ours in ours])
+    ax.bars.set_alpha(np.where(ours, 0.9, 0.85))
+    ax.shadows.set_heights(scores)
+    ax.value_texts.set_ys(scores + 1)
+    ax.value_texts.set_texts(f'{score:.1f}' for score in scores)
+    
+    ax.hatch.set_visible(False)
+    ax.annotation_text.set_visible(False)
+    ax.baseline_line.set_visible(False)
+    for i in np.flatnonzero(ours):
+        score = scores[i]
+        ax.baseline_line.set_ydata([score, score])
+        ax.baseline_line.set_visible(True)
+        # Add hatching to "Ours" if requested (for second plot)
+        if add_hatching:
+            ax.hatch.set_bounds(ax.bars.x[i] - ax.bars.width / 2, 0, ax.bars.width, score)
+            ax.hatch.set_alpha(0.9)
+            ax.hatch.set_visible(True)
+            ax.annotation_text.set_position((ax.bars.x[i], score - 4))
+            ax.annotation_text.set_visible(True)
+
+
+class FigurePool:
+    """Laid-out figures reused across charts, at most one per bar count
+
+    Rendering a batch only updates bar heights, colors and labels in place
+    instead of rebuilding axes, so memory stays flat however many charts
+    are produced. Figures are released on ``close()`` or when the least
+    recently used one is evicted.
+    """
+
+    def __init__(self, max_figures=4):
+        self.max_figures = max_figures
+        self.figures = OrderedDict()
+
+    def acquire(self, n_bars):
+        if n_bars in self.figures:
+            self.figures.move_to_end(n_bars)
+        else:
+            if len(self.figures) >= self.max_figures:
+                _, (fig, _) = self.figures.popitem(last=False)
+                fig.clear()
+            self.figures[n_bars] = layout_plot(n_bars)
+        return self.figures[n_bars]
+
+    def close(self):
+        for fig, _ in self.figures.values():
+            fig.clear()
+        self.figures.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def drawing_code():
+    """Source of everything that draws and writes a chart, including the collections"""
+    return source_of(layout_plot, update_plot, BarCollection, LabelCollection, export_figure,
+                     tight_bbox)
+
+
+def plot_key(models, scores, base_color, title, add_hatching, export, exports):
+    """Cache key for one chart in one export format
+
+    The other exports are part of the key because they share the layout
+    (tight bounding box) and, for rasters, the rasterization.
+    """
+    return content_key('libero_plot', drawing_code(), models, scores,
+                       base_color, title, add_hatching, color_ours, render_settings(),
+                       export[1:], [other[1:] for other in exports])
+
+
+def create_plot(models, scores, base_color, title, filename, add_hatching=False,
+                output_dir=OUTPUT_DIR, dpi=300, cache_dir=CACHE_DIR, pool=None, exports=None):
+    """Render one table to ``output_dir/filename``
+
+    ``exports`` writes other formats and sizes from the same layout instead,
+    e.g. ``['pdf', 'svg', 'png@150', 'png@640w']`` (see ``parse_exports``),
+    named after ``filename`` without its extension.
+
+    Pass a ``FigurePool`` to reuse its figures; otherwise a figure is laid
+    out just for this chart.
+    """
+    stem, ext = os.path.splitext(filename)
+    exports = parse_exports(exports or [ext], stem, dpi)
+    os.makedirs(output_dir, exist_ok=True)
+    # Skip the render when data, style, code and output options are unchanged
+    cache = None
+    missing = exports
+    if cache_dir:
+        cache = BuildCache(cache_dir)
+        keys = {export: plot_key(models, scores, base_color, title, add_hatching, export, exports)
+                for export in exports}
+        missing = []
+        for export in exports:
+            if cache.fetch(keys[export], os.path.join(output_dir, export.filename)):
+                print(f"Up to date (from cache): {export.filename}")
+            else:
+                missing.append(export)
+        if not missing:
+            return
+
+    fig, ax = pool.acquire(len(models)) if pool else layout_plot(len(models))
+    update_plot(ax, models, scores, base_color, title, add_hatching)
+    
+    fig.tight_layout()
+    paths = export_figure(fig, output_dir, missing, facecolor='white')
+    for export, path in zip(missing, paths):
+        print(f"Saved: {export.filename}")
+        if cache:
+            cache.store(keys[export], path)
+    # A batch evicts once at the end instead
+    if cache and pool is None:
+        cache.evict()
+
+
+def check_table(table, where):
+    """Raise ValueError unless ``table`` has a title and one score per model"""
+    if not isinstance(table, dict):
+        raise ValueError(f"{where}: a table must be a JSON object")
+    missing = [key for key in ('title', 'models', 'scores') if key not in table]
+    if missing:
+        raise ValueError(f"{where}: table has no {', '.join(missing)}")
+    models, scores = table['models'], table['scores']
+    if not isinstance(models, list) or not isinstance(scores, list):
+        raise ValueError(f"{where}: 'models' and 'scores' must be lists")
+    if len(models) != len(scores):
+        raise ValueError(f"{where}: {len(models)} models but {len(scores)} scores")
+    return table
+
+
+def load_tables(path):
+    """Read result tables from CSV, JSON or JSONL
+
+    - CSV: a ``model`` column plus one score column per table, e.g. one per
+      LIBERO suite (Spatial, Object, Goal, Long); empty cells are skipped.
+    - JSON: a list of tables, or ``{"tables": [...]}``.
+    - JSONL: one table per line, read lazily (e.g. one per checkpoint).
+
+    A table is a dict with ``title``, ``models`` and ``scores``, and optionally
+    ``filename``, ``color`` and ``add_hatching``. A malformed table raises
+    ValueError when it is reached.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.csv':
+        with open(path, newline='') as f:
+            reader = csv.DictReader(f)
+            rows = list(reader)
+        columns = [name for name in reader.fieldnames if name != 'model'] if rows else []
+        for column in columns:
+            # Short rows have None for their missing cells
+            filled = [row for row in rows if (row[column] or '').strip()]
+            yield {'title': column,
+                   'models': [row['model'].replace('\\n', '\n') for row in filled],
+                   'scores': [float(row[column]) for row in filled]}
+    elif ext == '.jsonl':
+        with open(path) as f:
+            for number, line in enumerate(f, 1):
+                if line.strip():
+                    yield check_table(json.loads(line), f"{path}:{number}")
+    elif ext == '.json':
+        with open(path) as f:
+            data = json.load(f)
+        tables = data.get('tables') if isinstance(data, dict) else data
+        if not isinstance(tables, list):
+            raise ValueError(f"{path}: expected a list of tables or {{\"tables\": [...]}}")
+        for number, table in enumerate(tables, 1):
+            yield check_table(table, f"{path}: table {number}")
+    else:
+        raise ValueError(f"Unsupported table format: {path} (expected .csv, .json or .jsonl)")
+
+
+def default_tables():
+    """The two LIBERO tables on the webpage, in ``load_tables`` form"""
+    return [
+        # Plot 1: Without Large-scale Action Pretraining
+        {'title': 'Models Without Large-scale Action Pretraining',
+         'models': models_without_pretrain, 'scores': scores_without_pretrain,
+         'color': color_without, 'add_hatching': False,
+         'filename': 'libero_without_pretraining.pdf'},
+        # Plot 2: With Large-scale Action Pretraining (add hatching to SimpleVLA)
+        {'title': 'Models With Large-scale Action Pretraining',
+         'models': models_with_pretrain, 'scores': scores_with_pretrain,
+         'color': color_with, 'add_hatching': True,
+         'filename': 'libero_with_pretraining.pdf'},
+    ]
+
+
+def table_filename(table, fmt):
+    """The table's ``filename``, or one made from its title"""
+    slug = re.sub(r'[^a-z0-9]+', '_', table['title'].lower()).strip('_')
+    return table.get('filename') or f'{slug}.{fmt}'
+
+
+def render_tables(tables, output_dir=OUTPUT_DIR, fmt='pdf', dpi=300, cache_dir=CACHE_DIR,
+                  exports=None):
+    """Render many tables in one process, reusing a pool of laid-out figures"""
+    count = 0
+    with FigurePool() as pool:
+        for table in tables:
+            title = table['title']
+            filename = table_filename(table, fmt)
+            create_plot(table['models'], table['scores'], table.get('color', color_with), title,
+                        filename, add_hatching=table.get('add_hatching', False),
+                        output_dir=output_dir, dpi=dpi, cache_dir=cache_dir, pool=pool,
+                        exports=exports)
+            count += 1
+    if cache_dir:
+        BuildCache(cache_dir).evict()
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render the static LIBERO comparison plots")
+    parser.add_argument('--output-dir', default=OUTPUT_DIR, help="Where to write the PDFs")
+    parser.add_argument('--tables', nargs='+', metavar='FILE',
+                        help="Render every table in these CSV/JSON/JSONL files instead")
+    parser.add_argument('--format', default='pdf', help="Output format for --tables")
+    parser.add_argument('--dpi', type=int, default=300, help="Output resolution")
+    parser.add_argument('--export', nargs='+', metavar='SPEC',
+                        help="Write these formats from one layout instead, "
+                             "e.g. pdf svg png@150 png@600 png@640w")
+    parser.add_argument('--cache-dir', default=CACHE_DIR, help="Build cache location")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Render everything from scratch and don't touch the cache")
+    args = parser.parse_args(argv)
+    cache_dir = None if args.no_cache else args.cache_dir
+
+    if args.tables:
+        tables = (table for path in args.tables for table in load_tables(path))
+        try:
+            count = render_tables(tables, args.output_dir, fmt=args.format, dpi=args.dpi,
+                                  cache_dir=cache_dir, exports=args.export)
+        except ValueError as error:
+            # A malformed table
+            parser.error(str(error))
+        print(f"\n{count} plots created in {args.output_dir}")
+        return
+
+    for table in default_tables():
+        create_plot(table['models'], table['scores'], table['color'], table['title'],
+                    table['filename'], add_hatching=table['add_hatching'],
+                    output_dir=args.output_dir, dpi=args.dpi, cache_dir=cache_dir,
+                    exports=args.export)
+
+    print("\nBoth plots created successfully!")
+    print("Files:")
+    print("  - libero_without_pretraining.pdf")
+    print("  - libero_with_pretraining.pdf")
+
+
+if __name__ == "__main__":
+    main()
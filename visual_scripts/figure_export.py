@@ -0,0 +1,104 @@
+import io
+import math
+import os
+import re
+from collections import namedtuple
+
+import matplotlib
+from PIL import Image
+
+VECTOR_FORMATS = ('pdf', 'svg', 'eps', 'ps')
+RASTER_FORMATS = ('png', 'jpg', 'jpeg', 'webp')
+
+# One output file: a format at a dpi, or a raster at a pixel width
+Export = namedtuple('Export', 'filename format dpi width')
+
+
+def parse_exports(specs, stem, dpi=300):
+    """Turn specs like ``pdf``, ``svg``, ``png@150`` or ``png@640w`` into Exports
+
+    A bare format is written as ``stem.<format>`` at ``dpi``; ``@150`` sets
+    the resolution (``stem_150dpi.png``) and ``@640w`` a raster width in
+    pixels (``stem_640w.png``).
+    """
+    exports = []
+    for spec in specs:
+        match = re.fullmatch(r'\.?(\w+)(?:@(\d+)(w?))?', spec.strip().lower())
+        if not match or match[1] not in VECTOR_FORMATS + RASTER_FORMATS:
+            raise ValueError(f"Unknown export {spec!r}: expected e.g. pdf, svg, png@150 "
+                             f"or png@640w ({', '.join(VECTOR_FORMATS + RASTER_FORMATS)})")
+        fmt, size, is_width = match[1], match[2], match[3]
+        if size is None:
+            exports.append(Export(f'{stem}.{fmt}', fmt, dpi, None))
+        elif is_width:
+            if fmt in VECTOR_FORMATS:
+                raise ValueError(f"Pixel widths only apply to raster formats: {spec!r}")
+            exports.append(Export(f'{stem}_{size}w.{fmt}', fmt, None, int(size)))
+        else:
+            exports.append(Export(f'{stem}_{size}dpi.{fmt}', fmt, int(size), None))
+    return exports
+
+
+def tight_bbox(fig):
+    """The ``bbox_inches='tight'`` box, computed once for every export"""
+    fig.draw_without_rendering()
+    bbox = fig.get_tightbbox(fig.canvas.get_renderer())
+    return bbox.padded(matplotlib.rcParams['savefig.pad_inches'])
+
+
+def export_figure(fig, output_dir, exports, **savefig_kwargs):
+    """Write every export of a laid-out figure.
+
+    The tight bounding box is computed once and shared by all files. Each
+    vector format is drawn by its own backend. All raster sizes come from
+    one Agg rasterization at the largest resolution asked for, area-averaged
+    down to each size by Pillow instead of re-rendering.
+    Returns the written paths, in the order of ``exports``.
+    """
+    if len(exports) == 1 and exports[0].width is None:
+        # Nothing to share, let savefig lay it out
+        export, = exports
+        path = os.path.join(output_dir, export.filename)
+        fig.savefig(path, format=export.format, dpi=export.dpi, bbox_inches='tight',
+                    **savefig_kwargs)
+        return [path]
+
+    bbox = tight_bbox(fig)
+    paths = {}
+    rasters = []
+    for export in exports:
+        if export.format in VECTOR_FORMATS:
+            path = os.path.join(output_dir, export.filename)
+            fig.savefig(path, format=export.format, dpi=export.dpi, bbox_inches=bbox,
+                        **savefig_kwargs)
+            paths[export] = path
+        else:
+            rasters.append(export)
+    if not rasters:
+        return [paths[export] for export in exports]
+
+    # Resolution that covers the largest raster
+    master_dpi = max(export.dpi or math.ceil(export.width / bbox.width) for export in rasters)
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='rgba', dpi=master_dpi, bbox_inches=bbox, **savefig_kwargs)
+    # Agg truncates the figure size in pixels the same way
+    size = (int(bbox.width * master_dpi), int(bbox.height * master_dpi))
+    master = Image.frombuffer('RGBA', size, buffer.getbuffer(), 'raw', 'RGBA', 0, 1)
+    if master.getextrema()[3] == (255, 255):
+        # Opaque: a quarter less to resample and encode
+        master = master.convert('RGB')
+
+    for export in rasters:
+        if export.width is not None:
+            dpi = export.width / bbox.width
+            target = (export.width, max(1, round(size[1] * export.width / size[0])))
+        else:
+            dpi = export.dpi
+            target = (int(bbox.width * dpi), int(bbox.height * dpi))
+        image = master if target == size else master.resize(target, Image.Resampling.BOX)
+        if export.format in ('jpg', 'jpeg') and image.mode == 'RGBA':
+            image = image.convert('RGB')
+        path = os.path.join(output_dir, export.filename)
+        image.save(path, dpi=(dpi, dpi))
+        paths[export] = path
+    return [paths[export] for export in exports]
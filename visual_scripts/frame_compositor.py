@@ -0,0 +1,260 @@
+import numpy as np
+
+# Track setters that only scale the opacity of (part of) an artist, and the
+# ones that move it. Anything else can't be composited from fixed layers.
+ALPHA_SETTERS = ('set_alpha', 'set_alphas', 'set_bbox_alpha', 'set_ticklabel_alpha',
+                 'set_grid_alpha')
+GEOMETRY_SETTERS = ('set_heights', 'set_ys')
+
+
+class Layer:
+    """One rasterized artist, or group of its elements, ready to blend.
+
+    Pixels are a premultiplied float32 crop at ``(top, left)``, blended
+    with a per-frame ``opacity``. ``shifts`` moves the layer down by whole
+    pixel rows per frame: all of it (a label following its bar), or, when
+    ``cap_rows`` is set, only its top ``cap_rows`` rows while the rest is
+    cropped, so a full-height bar is cut down to each frame's height.
+    """
+
+    def __init__(self, top, left, rgba, opacity, shifts=None, cap_rows=None):
+        self.top = top
+        self.left = left
+        alpha = rgba[..., 3:4].astype(np.float32) / 255
+        self.alpha = alpha
+        self.color = rgba[..., :3].astype(np.float32) / 255 * alpha
+        self.opacity = np.asarray(opacity, dtype=np.float32)
+        self.shifts = shifts
+        self.cap_rows = cap_rows
+
+    def shift(self, frame):
+        return 0 if self.shifts is None else int(self.shifts[frame])
+
+    def extent(self, frame):
+        """``(top, bottom, left, right)`` pixels covered at ``frame``, or None"""
+        if self.opacity[frame] == 0:
+            return None
+        top = self.top + self.shift(frame)
+        bottom = self.top + len(self.alpha) + (0 if self.cap_rows is not None else
+                                               self.shift(frame))
+        return top, bottom, self.left, self.left + self.alpha.shape[1]
+
+    def pieces(self, frame):
+        """``(top, left, color, alpha)`` crops making up the layer at ``frame``"""
+        if self.shifts is None:
+            return [(self.top, self.left, self.color, self.alpha)]
+        shift = self.shift(frame)
+        if self.cap_rows is None:
+            return [(self.top + shift, self.left, self.color, self.alpha)]
+        height = len(self.alpha)
+        # The cap moves down with the top edge; rows it uncovers are body rows,
+        # which look the same at any height, and nothing goes below the clip
+        cap = min(self.cap_rows, max(height - shift, 0))
+        body = self.cap_rows + shift
+        return [(self.top + shift, self.left, self.color[:cap], self.alpha[:cap]),
+                (self.top + body, self.left, self.color[body:], self.alpha[body:])]
+
+
+def blend(out, top, left, color, alpha, opacity, clip):
+    """Composite a premultiplied crop over ``out`` in place, within ``clip``
+
+    ``clip`` is a ``(top, bottom, left, right)`` rectangle inside ``out``.
+    """
+    rows = slice(max(top, clip[0]), min(top + len(alpha), clip[1]))
+    cols = slice(max(left, clip[2]), min(left + alpha.shape[1], clip[3]))
+    if rows.start >= rows.stop or cols.start >= cols.stop:
+        return
+    crop = (slice(rows.start - top, rows.stop - top), slice(cols.start - left, cols.stop - left))
+    region = out[rows, cols]
+    region *= 1 - opacity * alpha[crop]
+    region += opacity * color[crop]
+
+
+class FrameCompositor:
+    """Frames composited with NumPy from layers rasterized once.
+
+    Every artist in ``layered`` (the tracked ones, and static ones drawn
+    above them, in draw order) is rasterized on its own; everything else
+    is drawn once as the background. A frame is then the background with
+    each layer alpha-blended on top at that frame's opacity and offset,
+    without any matplotlib drawing.
+
+    Tracks must be opacity changes (``ALPHA_SETTERS``) whose values for
+    one element are proportional to each other, or ``set_heights`` /
+    ``set_ys`` motion. Positions snap to whole pixels and overlapping
+    parts of one semi-transparent artist are blended as a single layer,
+    so frames differ slightly from a full draw at antialiased edges.
+    """
+
+    def __init__(self, fig, timeline, layered):
+        self.fig = fig
+        self.timeline = timeline
+        self.height = int(fig.canvas.get_width_height()[1])
+        renderer = fig.canvas.get_renderer()
+
+        # Background: the figure without any layered artist
+        timeline.apply(0)
+        for artist in layered:
+            artist.set_animated(True)
+        fig.canvas.draw()
+        self.background = np.asarray(renderer.buffer_rgba())[..., :3].astype(np.float32) / 255
+        for artist in layered:
+            artist.set_animated(False)
+
+        tracks = {}
+        for track in timeline.tracks:
+            tracks.setdefault(track.artist, []).append(track)
+        self.layers = []
+        for artist in layered:
+            self.layers += self._artist_layers(artist, tracks.get(artist, []))
+        timeline.apply(0)
+        self._out = self.background.copy()
+        self._rgba = np.full(self.background.shape[:2] + (4,), 255, dtype=np.uint8)
+        self._last = None
+
+    def _raster(self, artist):
+        """The artist drawn alone on a transparent canvas, as full-size RGBA"""
+        renderer = self.fig.canvas.get_renderer()
+        renderer.clear()
+        artist.draw(renderer)
+        return np.array(renderer.buffer_rgba())
+
+    def _layer(self, rgba, opacity, **motion):
+        drawn = rgba[..., 3] > 0
+        rows, cols = np.flatnonzero(drawn.any(axis=1)), np.flatnonzero(drawn.any(axis=0))
+        if not len(rows):
+            return None
+        top, left = rows[0], cols[0]
+        crop = rgba[top:rows[-1] + 1, left:cols[-1] + 1]
+        if 'cap_row' in motion:
+            motion['cap_rows'] = max(int(np.ceil(motion.pop('cap_row') - top)), 0)
+        return Layer(int(top), int(left), crop, opacity, **motion)
+
+    def _rows(self, artist, x, y):
+        """Canvas pixel rows (from the top) of data points"""
+        points = np.column_stack(np.broadcast_arrays(x, y))
+        return self.height - artist.get_transform().transform(points)[:, 1]
+
+    def _artist_layers(self, artist, tracks):
+        n_frames = self.timeline.n_frames
+        if not tracks:
+            return [layer for layer in [self._layer(self._raster(artist), np.ones(n_frames))]
+                    if layer is not None]
+        for track in tracks:
+            if track.name not in ALPHA_SETTERS + GEOMETRY_SETTERS:
+                raise ValueError(f"Can't composite the {track.name} track of {artist}: "
+                                 f"only opacity and bar/label motion can be layered")
+        alphas = [track for track in tracks if track.name in ALPHA_SETTERS]
+        moves = [track for track in tracks if track.name in GEOMETRY_SETTERS]
+        elementwise = any(track.values.ndim == 2 for track in tracks)
+        n = max(track.values.shape[1] if track.values.ndim == 2 else 1 for track in tracks)
+
+        def columns(track):
+            return np.broadcast_to(track.values.reshape(n_frames, -1), (n_frames, n))
+
+        # Each element's opacity over time, and its alpha values at full opacity
+        if alphas:
+            values = np.stack([columns(track) for track in alphas])
+            peaks = values.max(axis=1)
+            strongest = peaks.max(axis=0)
+            opacity = values[peaks.argmax(axis=0), :, np.arange(n)].T / np.where(strongest, strongest, 1)
+            if not np.allclose(values, peaks[:, None, :] * opacity[None], atol=1e-6):
+                raise ValueError(f"Can't composite {artist}: its opacity tracks don't fade together")
+        else:
+            peaks = np.ones((0, n))
+            strongest = np.ones(n)
+            opacity = np.ones((n_frames, n))
+        moving = np.zeros(n, dtype=bool)
+        for track in moves:
+            moving |= np.ptp(columns(track), axis=0) > 0
+
+        def pose(members, frame=0):
+            """Members at full opacity, the rest hidden; geometry at ``frame``"""
+            for track in moves:
+                value = columns(track)[frame].copy()
+                track.setter(artist, value if elementwise else value[0])
+            for track, peak in zip(alphas, peaks):
+                value = np.where(members, peak, 0)
+                track.setter(artist, value if elementwise else float(value[0]))
+
+        # What the artist draws with every tracked opacity at zero, e.g. an
+        # axis' tick marks while only its labels fade, stays drawn as is
+        layers = []
+        base = None
+        if alphas:
+            pose(np.zeros(n, dtype=bool))
+            base = self._raster(artist)
+            if base[..., 3].any():
+                if moving.any():
+                    raise ValueError(f"Can't composite {artist}: it moves and has unfaded parts")
+                layers.append(self._layer(base, np.ones(n_frames)))
+
+        groups = {}
+        for e in np.flatnonzero(strongest > 0):
+            key = (opacity[:, e].tobytes(), e if moving[e] else -1)
+            groups.setdefault(key, []).append(e)
+        for members in groups.values():
+            mask = np.isin(np.arange(n), members)
+            motion = {}
+            reference = 0
+            if moving[members[0]]:
+                e = members[0]
+                track, = [track for track in moves if np.ptp(columns(track)[:, e]) > 0]
+                column = columns(track)[:, e]
+                if track.name == 'set_heights':
+                    # Rasterized at full height, cut down to each frame's height
+                    reference = int(column.argmax())
+                    bottom = artist.bottom + column
+                    top_rows = self._rows(artist, artist.x[e], bottom)
+                    edge = np.max(artist.get_linewidths()) * self.fig.dpi / 72
+                    motion['cap_row'] = top_rows[reference] + edge / 2 + 1
+                else:
+                    # Labels move with their bar, drawn where they are most visible
+                    reference = int(opacity[:, e].argmax())
+                    top_rows = self._rows(artist, artist.x[e], column)
+                motion['shifts'] = np.rint(top_rows - top_rows[reference]).astype(int)
+            pose(mask, reference)
+            rgba = self._raster(artist)
+            if base is not None:
+                rgba[(rgba == base).all(axis=-1)] = 0
+            layer = self._layer(rgba, opacity[:, members[0]], **motion)
+            if layer is not None:
+                layers.append(layer)
+        return [layer for layer in layers if layer is not None]
+
+    def dirty(self, frame):
+        """Rectangles that differ between the last frame composited and ``frame``"""
+        height, width = self.background.shape[:2]
+        if self._last is None:
+            return [(0, height, 0, width)]
+        rects = set()
+        last = self._last
+        for layer in self.layers:
+            if (layer.opacity[frame] == layer.opacity[last]
+                    and layer.shift(frame) == layer.shift(last)):
+                continue
+            for extent in (layer.extent(last), layer.extent(frame)):
+                if extent is not None:
+                    top, bottom, left, right = extent
+                    rects.add((max(top, 0), min(bottom, height), max(left, 0), min(right, width)))
+        return [rect for rect in rects if rect[0] < rect[1] and rect[2] < rect[3]]
+
+    def frame(self, frame):
+        """RGBA pixels of ``frame``; the buffer is reused by the next call
+
+        Only the rectangles where a layer changed since the previous call
+        are composited again, so a frame costs what moves in it.
+        """
+        out = self._out
+        for rect in self.dirty(frame):
+            region = (slice(rect[0], rect[1]), slice(rect[2], rect[3]))
+            out[region] = self.background[region]
+            for layer in self.layers:
+                opacity = layer.opacity[frame]
+                if opacity == 0:
+                    continue
+                for top, left, color, alpha in layer.pieces(frame):
+                    blend(out, top, left, color, alpha, opacity, rect)
+            self._rgba[region + (slice(0, 3),)] = out[region] * 255 + 0.5
+        self._last = frame
+        return self._rgba
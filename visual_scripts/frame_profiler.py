@@ -0,0 +1,96 @@
+import contextlib
+import json
+import os
+import re
+import time
+
+# Render stages, in the order a frame goes through them
+STAGES = ('update', 'capture', 'draw', 'grab', 'cache', 'write')
+
+
+class FrameProfiler:
+    """Opt-in timings of every render stage of every frame.
+
+    Stages are timed with ``span(stage, frame)``; each event is tagged with
+    the timeline phase its frame falls in, as given by ``phase_of`` (e.g.
+    ``Timeline.phase_of``). ``write_trace`` saves the events
+    as a Chrome trace (chrome://tracing or ui.perfetto.dev, one track per
+    process) and ``summary`` ranks the phases by total time.
+    """
+
+    def __init__(self, phase_of):
+        self.phase_of = phase_of
+        self.events = []
+
+    @contextlib.contextmanager
+    def span(self, stage, frame):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.events.append((stage, frame, start, time.perf_counter() - start, os.getpid()))
+
+    def summary(self):
+        """Per-phase totals, slowest phase first"""
+        phases = {}
+        for stage, frame, _, duration, _ in self.events:
+            phase = phases.setdefault(self.phase_of(frame),
+                                      {'frames': set(), 'total': 0.0,
+                                       'stages': dict.fromkeys(STAGES, 0.0)})
+            phase['frames'].add(frame)
+            phase['total'] += duration
+            phase['stages'][stage] += duration
+        rows = [{'phase': name, 'kind': phase_kind(name), 'frames': len(phase['frames']),
+                 'total_ms': 1000 * phase['total'],
+                 'ms_per_frame': 1000 * phase['total'] / len(phase['frames']),
+                 'stage_ms_per_frame': {stage: 1000 * total / len(phase['frames'])
+                                        for stage, total in phase['stages'].items()}}
+                for name, phase in phases.items()]
+        return sorted(rows, key=lambda row: row['total_ms'], reverse=True)
+
+    def format_summary(self):
+        rows = self.summary()
+        if not rows:
+            return "No frames were rendered"
+        lines = [f"{'phase':<10} {'frames':>6} {'total ms':>9} {'ms/frame':>9}  "
+                 + " ".join(f"{stage:>8}" for stage in STAGES)]
+        for row in rows:
+            lines.append(f"{row['phase']:<10} {row['frames']:>6} {row['total_ms']:9.1f} "
+                         f"{row['ms_per_frame']:9.2f}  "
+                         + " ".join(f"{row['stage_ms_per_frame'][stage]:8.2f}"
+                                    for stage in STAGES))
+        return "\n".join(lines)
+
+    def write_trace(self, path):
+        """Save the events as a Chrome trace, with the summary alongside"""
+        origin = min((start for _, _, start, _, _ in self.events), default=0)
+        trace = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0,
+                  'args': {'name': 'encoder' if pid == os.getpid() else f'worker {pid}'}}
+                 for pid in sorted({event[4] for event in self.events})]
+        for stage, frame, start, duration, pid in self.events:
+            phase = self.phase_of(frame)
+            trace.append({'name': stage, 'cat': phase_kind(phase), 'ph': 'X',
+                          'ts': 1e6 * (start - origin), 'dur': 1e6 * duration,
+                          'pid': pid, 'tid': 0,
+                          'args': {'frame': int(frame), 'phase': phase}})
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': trace, 'displayTimeUnit': 'ms',
+                       'phases': self.summary()}, f)
+
+
+class NullProfiler:
+    """Stands in for ``FrameProfiler`` when profiling is off, at no cost"""
+
+    events = ()
+    _span = contextlib.nullcontext()
+
+    def span(self, stage, frame):
+        return self._span
+
+
+NO_PROFILER = NullProfiler()
+
+
+def phase_kind(phase):
+    """'grow1' -> 'grow': the kind of motion, shared by numbered phases"""
+    return re.sub(r'\d+$', '', phase) if phase else 'none'
@@ -0,0 +1,5 @@
+import os
+
+# The site root is the repository root, wherever it is checked out; site
+# paths (Videos/..., data/figures/...) are relative to it
+SITE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -0,0 +1,92 @@
+import json
+import os
+
+import matplotlib
+
+from build_cache import CACHE_DIR
+
+# seaborn's "whitegrid" style, so the scripts don't need to import seaborn
+# just for sns.set_style("whitegrid"). Its 'rocket' colormap is left out,
+# it only exists once seaborn is imported and no chart uses a colormap.
+WHITEGRID = {
+    'axes.axisbelow': True,
+    'axes.edgecolor': '.8',
+    'axes.facecolor': 'white',
+    'axes.grid': True,
+    'axes.labelcolor': '.15',
+    'axes.spines.bottom': True,
+    'axes.spines.left': True,
+    'axes.spines.right': True,
+    'axes.spines.top': True,
+    'figure.facecolor': 'white',
+    'font.family': ['sans-serif'],
+    'font.sans-serif': ['Arial', 'DejaVu Sans', 'Liberation Sans', 'Bitstream Vera Sans',
+                        'sans-serif'],
+    'grid.color': '.8',
+    'grid.linestyle': '-',
+    'lines.solid_capstyle': 'round',
+    'patch.edgecolor': 'w',
+    'patch.force_edgecolor': True,
+    'text.color': '.15',
+    'xtick.bottom': False,
+    'xtick.color': '.15',
+    'xtick.direction': 'out',
+    'xtick.top': False,
+    'ytick.color': '.15',
+    'ytick.direction': 'out',
+    'ytick.left': False,
+    'ytick.right': False,
+}
+
+# Helvetica first, then what matplotlib itself falls back to without it
+FONT_CANDIDATES = ('Helvetica', 'DejaVu Sans')
+FONT_CHOICE_PATH = os.path.join(CACHE_DIR, 'font.json')
+
+
+def resolve_font(candidates=FONT_CANDIDATES, refresh=False):
+    """First installed font family in ``candidates``
+
+    The choice is saved to ``FONT_CHOICE_PATH``, so later runs skip the font
+    search (and the "findfont: Font family not found" warnings on machines
+    without Helvetica). It is looked up again when the candidates or the
+    matplotlib version change, when the chosen font file is gone, or with
+    ``refresh=True``.
+    """
+    signature = {'matplotlib': matplotlib.__version__, 'candidates': list(candidates)}
+    if not refresh:
+        try:
+            with open(FONT_CHOICE_PATH) as f:
+                choice = json.load(f)
+            if choice['signature'] == signature and os.path.exists(choice['path']):
+                return choice['family']
+        except (OSError, ValueError, KeyError):
+            pass
+
+    from matplotlib import font_manager
+    for family in candidates:
+        try:
+            path = font_manager.findfont(font_manager.FontProperties(family=family),
+                                         fallback_to_default=False)
+            break
+        except ValueError:
+            continue
+    else:
+        family = font_manager.fontManager.defaultFamily['ttf']
+        path = font_manager.findfont(font_manager.FontProperties(family=family))
+
+    try:
+        os.makedirs(os.path.dirname(FONT_CHOICE_PATH), exist_ok=True)
+        with open(FONT_CHOICE_PATH, 'w') as f:
+            json.dump({'signature': signature, 'family': family, 'path': path}, f)
+    except OSError:  # Read-only home: resolve again next time
+        pass
+    return family
+
+
+def apply_style():
+    """Set the rcParams shared by every chart"""
+    # Fix Type 3 font issue - use TrueType fonts instead
+    matplotlib.rcParams['pdf.fonttype'] = 42  # TrueType fonts
+    matplotlib.rcParams['ps.fonttype'] = 42   # TrueType fonts for EPS
+    matplotlib.rcParams.update(WHITEGRID)
+    matplotlib.rcParams['font.family'] = resolve_font()
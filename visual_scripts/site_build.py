@@ -0,0 +1,420 @@
+"""Build every site asset from one command, as a graph of tasks
+
+Each asset is a task with the files it reads and writes: the two plot
+PDFs, the LIBERO animation and the web copies of every video and figure
+(``web_assets.py``), whose manifest comes last.
+A task depends on the tasks that write its inputs, so the web copies of
+``Videos/libero_results.mp4`` wait for the animation while everything
+else runs alongside it:
+
+    python -m visual_scripts build                  # all of it, one job per CPU
+    python -m visual_scripts build --jobs 2 'plot:*'
+    python -m visual_scripts build --list           # what would run
+
+Independent tasks run at once in a process pool, longest remaining chain
+first. A task whose inputs have the same content as at its last run, and
+whose outputs are untouched since, is skipped. The report at the end
+shows each task's time and the critical path: the chain of dependent
+tasks that bounds the build's wall time however many jobs it gets.
+"""
+import argparse
+import contextlib
+import fnmatch
+import io
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from build_cache import CACHE_DIR, content_key, file_digest
+from paths import SITE_ROOT
+
+# Last run of every task, and per-task manifest entries, kept out of the site
+STATE_DIR = '.site_build'
+PLOT_DIR = 'data/figures'
+
+# Code each kind of task runs, as inputs: editing it rebuilds what it draws
+PLOT_CODE = ('create_libero_plot.py', 'bar_collections.py', 'build_cache.py', 'figure_export.py',
+             'plot_style.py')
+ANIMATION_CODE = ('create_libero_animation.py', 'animated_image.py', 'bar_collections.py',
+                  'build_cache.py', 'frame_compositor.py', 'frame_profiler.py', 'plot_style.py',
+                  'timeline.py', 'video_writer.py')
+ASSET_CODE = ('web_assets.py', 'build_cache.py')
+
+def code(*names):
+    return [f'visual_scripts/{name}' for name in names]
+
+
+class Task:
+    """One step of the build: ``function(*args)`` reads ``inputs`` and writes ``outputs``
+
+    Paths are relative to the site root. ``function`` runs in a worker
+    process, so it must be a module-level function; it may return more
+    paths it wrote, which are then checked like ``outputs``.
+    """
+
+    def __init__(self, name, function, args=(), inputs=(), outputs=()):
+        self.name = name
+        self.function = function
+        self.args = tuple(args)
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+
+    def __repr__(self):
+        return f'Task({self.name!r})'
+
+
+# Task functions, run in the workers. Each imports its script on first use.
+
+def render_plot(index, output_dir, cache_dir):
+    import create_libero_plot as plots
+    table = plots.default_tables()[index]
+    plots.create_plot(table['models'], table['scores'], table['color'], table['title'],
+                      table['filename'], add_hatching=table['add_hatching'],
+                      output_dir=output_dir, cache_dir=cache_dir)
+
+
+def render_animation(output_path, cache_dir):
+    import create_libero_animation as animation
+    animation.create_animated_plot(output_path, blit=True, cache_dir=cache_dir)
+
+
+def build_web_assets(root, source, entry_path, cache_dir):
+    """Web copies of one source; its manifest entry goes to ``entry_path``"""
+    import web_assets
+    entry = web_assets.build_source(source, root, web_assets.OUTPUT_DIR, cache_dir)
+    with open(entry_path, 'w') as f:
+        json.dump({'source': source, 'video': source in web_assets.VIDEOS, 'entry': entry}, f)
+    if source in web_assets.VIDEOS:
+        files = [s['src'] for s in entry['sources']] + [entry['poster'], entry['preview']['src']]
+    else:
+        files = [path.split(' ')[0] for s in entry['sources'] for path in s['srcset'].split(', ')]
+    return files
+
+
+def write_manifest(root, entry_paths):
+    import web_assets
+    manifest = {'videos': {}, 'images': {}}
+    for path in entry_paths:
+        with open(path) as f:
+            record = json.load(f)
+        manifest['videos' if record['video'] else 'images'][record['source']] = record['entry']
+    web_assets.write_manifest(os.path.join(root, web_assets.OUTPUT_DIR), manifest)
+
+
+def site_tasks(root=SITE_ROOT, cache_dir=CACHE_DIR):
+    """Every task of the site build"""
+    import web_assets
+    tasks = []
+    # In create_libero_plot.default_tables() order
+    for index, filename in enumerate(('libero_without_pretraining.pdf',
+                                      'libero_with_pretraining.pdf')):
+        tasks.append(Task(f'plot:{filename}', render_plot,
+                          (index, os.path.join(root, PLOT_DIR), cache_dir),
+                          code(*PLOT_CODE), [f'{PLOT_DIR}/{filename}']))
+    animation = 'Videos/libero_results.mp4'
+    tasks.append(Task('animation', render_animation, (os.path.join(root, animation), cache_dir),
+                      code(*ANIMATION_CODE), [animation]))
+
+    # The animation is a source of web assets even before it is first built
+    videos = [video for video in web_assets.VIDEOS
+              if video == animation or os.path.exists(os.path.join(root, video))]
+    entries = []
+    for source in videos + list(web_assets.figure_sources(root)):
+        entry = f'{STATE_DIR}/entries/{source.replace("/", "_")}.json'
+        tasks.append(Task(f'assets:{source}', build_web_assets,
+                          (root, source, os.path.join(root, entry), cache_dir),
+                          [source] + code(*ASSET_CODE), [entry]))
+        entries.append(entry)
+    tasks.append(Task('manifest', write_manifest,
+                      (root, [os.path.join(root, entry) for entry in entries]),
+                      entries + code(*ASSET_CODE), [f'{web_assets.OUTPUT_DIR}/manifest.json']))
+    return tasks
+
+
+def run_task(function, args):
+    """Run a task in a worker, quietly; returns its time and extra outputs"""
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        extra = function(*args)
+    return time.perf_counter() - start, list(extra or ())
+
+
+class SiteBuild:
+    """Runs a set of tasks in dependency order, skipping those that are up to date.
+
+    A task's stamp is a hash of its arguments and the content of its
+    inputs; its outputs are remembered by size and mtime. Both are saved
+    in ``STATE_DIR/state.json`` after every task, with how long it took,
+    which orders the next build's tasks longest chain first.
+    """
+
+    def __init__(self, tasks, root=SITE_ROOT):
+        self.root = root
+        self.tasks = {task.name: task for task in tasks}
+        writers = {}
+        for task in tasks:
+            for output in task.outputs:
+                if output in writers:
+                    raise ValueError(f"{output} is written by both {writers[output]} and {task.name}")
+                writers[output] = task.name
+        self.deps = {task.name: sorted({writers[path] for path in task.inputs if path in writers})
+                     for task in tasks}
+        self.order = self._topological_order()
+        self.state_path = os.path.join(root, STATE_DIR, 'state.json')
+        try:
+            with open(self.state_path) as f:
+                self.state = json.load(f)
+        except (FileNotFoundError, ValueError):
+            self.state = {}
+        self.state.setdefault('tasks', {})
+        self.state.setdefault('digests', {})
+
+    def _topological_order(self):
+        order, visiting, visited = [], set(), set()
+
+        def visit(name, chain):
+            if name in visited:
+                return
+            if name in visiting:
+                raise ValueError(f"Dependency cycle: {' -> '.join(chain + [name])}")
+            visiting.add(name)
+            for dep in self.deps[name]:
+                visit(dep, chain + [name])
+            visiting.discard(name)
+            visited.add(name)
+            order.append(name)
+
+        for name in self.tasks:
+            visit(name, [])
+        return order
+
+    def select(self, patterns):
+        """Tasks matching any of ``patterns``, with everything they depend on"""
+        if not patterns:
+            return list(self.order)
+        wanted = set()
+
+        def add(name):
+            if name not in wanted:
+                wanted.add(name)
+                for dep in self.deps[name]:
+                    add(dep)
+
+        for pattern in patterns:
+            matches = [name for name in self.tasks if fnmatch.fnmatchcase(name, pattern)]
+            if not matches:
+                raise ValueError(f"No task matches {pattern!r} (see --list)")
+            for name in matches:
+                add(name)
+        return [name for name in self.order if name in wanted]
+
+    def digest(self, path):
+        """Content hash of a site file, re-read only when its size or mtime changed"""
+        stat = os.stat(os.path.join(self.root, path))
+        known = self.state['digests'].get(path)
+        if known and known[:2] == [stat.st_size, stat.st_mtime_ns]:
+            return known[2]
+        digest = file_digest(os.path.join(self.root, path))
+        self.state['digests'][path] = [stat.st_size, stat.st_mtime_ns, digest]
+        return digest
+
+    def stamp(self, task):
+        missing = [path for path in task.inputs if not os.path.exists(os.path.join(self.root, path))]
+        if missing:
+            raise FileNotFoundError(f"{task.name}: missing input {', '.join(missing)}")
+        return content_key(task.name, task.args, [(path, self.digest(path)) for path in task.inputs])
+
+    def output_stats(self, paths):
+        stats = {}
+        for path in paths:
+            stat = os.stat(os.path.join(self.root, path))
+            stats[path] = [stat.st_size, stat.st_mtime_ns]
+        return stats
+
+    def up_to_date(self, task):
+        last = self.state['tasks'].get(task.name)
+        if not last or last['stamp'] != self.stamp(task):
+            return False
+        try:
+            return self.output_stats(last['outputs']) == last['outputs']
+        except FileNotFoundError:
+            return False
+
+    def record(self, task, seconds, extra):
+        outputs = self.output_stats(task.outputs + [path for path in extra
+                                                    if path not in task.outputs])
+        self.state['tasks'][task.name] = {'stamp': self.stamp(task), 'outputs': outputs,
+                                          'seconds': seconds}
+        self.save_state()
+
+    def save_state(self):
+        directory = os.path.dirname(self.state_path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(self.state, f)
+        os.replace(tmp, self.state_path)
+
+    def chain_seconds(self, names, seconds):
+        """Length of the longest chain of tasks starting at each task"""
+        dependents = {name: [] for name in names}
+        for name in names:
+            for dep in self.deps[name]:
+                if dep in dependents:
+                    dependents[dep].append(name)
+        chain = {}
+        for name in reversed(names):
+            chain[name] = seconds.get(name, 0) + max((chain[d] for d in dependents[name]), default=0)
+        return chain
+
+    def _start(self, name, pool, running, results, jobs, force):
+        """Settle or submit a task whose dependencies are done; False if no job is free"""
+        task = self.tasks[name]
+        try:
+            current = not force and self.up_to_date(task)
+        except FileNotFoundError as error:
+            results[name] = ('failed', 0.0)
+            print(f"Failed: {error}")
+            return True
+        if current:
+            results[name] = ('up to date', 0.0)
+            print(f"Up to date: {name}")
+            return True
+        if len(running) >= jobs:
+            return False
+        print(f"Building: {name}")
+        for output in task.outputs:
+            os.makedirs(os.path.dirname(os.path.join(self.root, output)), exist_ok=True)
+        running[pool.submit(run_task, task.function, task.args)] = name
+        return True
+
+    def run(self, patterns=(), jobs=1, force=False):
+        """Build the selected tasks; returns ``{name: (status, seconds)}``
+
+        Status is 'built', 'up to date', 'failed' or 'skipped' (after a
+        failed dependency).
+        """
+        names = self.select(patterns)
+        # Longest chain first, from the last run's timings
+        last_seconds = {name: self.state['tasks'].get(name, {}).get('seconds', 0) for name in names}
+        priority = self.chain_seconds(names, last_seconds)
+        results = {}
+        pending = list(names)
+        running = {}
+        start = time.perf_counter()
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=jobs, mp_context=context) as pool:
+            while pending or running:
+                started = False
+                for name in sorted(pending, key=lambda name: -priority[name]):
+                    deps = [results.get(dep, ('waiting',))[0] for dep in self.deps[name]]
+                    if 'failed' in deps or 'skipped' in deps:
+                        results[name] = ('skipped', 0.0)
+                    elif any(status not in ('built', 'up to date') for status in deps):
+                        continue
+                    elif not self._start(name, pool, running, results, jobs, force):
+                        continue
+                    pending.remove(name)
+                    started = True
+                if started:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        seconds, extra = future.result()
+                        self.record(self.tasks[name], seconds, extra)
+                    except Exception as error:
+                        results[name] = ('failed', 0.0)
+                        print(f"Failed: {name}")
+                        # Includes the worker's traceback
+                        traceback.print_exception(error)
+                        continue
+                    results[name] = ('built', seconds)
+                    print(f"Built: {name} ({seconds:.1f} s)")
+        self.save_state()
+        self.wall_seconds = time.perf_counter() - start
+        return results
+
+    def report(self, results, jobs):
+        """Per-task times, the critical path, and how much the jobs saved"""
+        names = [name for name in self.order if name in results]
+        seconds = {name: results[name][1] for name in names}
+        chain = self.chain_seconds(names, seconds)
+        # Follow the longest chain from its first task
+        path = []
+        candidates = [name for name in names
+                      if not any(dep in results for dep in self.deps[name])]
+        while candidates:
+            name = max(candidates, key=lambda name: chain[name])
+            path.append(name)
+            candidates = [other for other in names if name in self.deps[other]]
+        path = [name for name in path if seconds[name] > 0] or path[:1]
+        width = max(len(name) for name in names)
+        lines = [f"{'Task':<{width}}  {'Status':<10}  {'Time':>8}"]
+        for name in sorted(names, key=lambda name: -seconds[name]):
+            status, took = results[name]
+            marker = '  *' if name in path and took > 0 else ''
+            lines.append(f"{name:<{width}}  {status:<10}  {took:>6.1f} s{marker}")
+        total = sum(seconds.values())
+        critical = sum(seconds[name] for name in path)
+        lines.append('')
+        if not total:
+            lines.append(f"Nothing to build: all {len(names)} tasks are up to date")
+            return '\n'.join(lines)
+        lines.append(f"Critical path (*): {' -> '.join(path)} ({critical:.1f} s)")
+        lines.append(f"Wall time {self.wall_seconds:.1f} s with --jobs {jobs}, for {total:.1f} s "
+                     f"of tasks and a {critical:.1f} s critical path")
+        return '\n'.join(lines)
+
+    def describe(self, patterns=()):
+        """The selected tasks, their dependencies and whether they would run"""
+        lines = []
+        for name in self.select(patterns):
+            try:
+                status = 'up to date' if self.up_to_date(self.tasks[name]) else 'stale'
+            except FileNotFoundError:
+                status = 'stale'  # An input another task writes
+            deps = f" (after {', '.join(self.deps[name])})" if self.deps[name] else ''
+            lines.append(f"{name}: {status}{deps}")
+        return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build every site asset in parallel, "
+                                                 "skipping the up-to-date ones")
+    parser.add_argument('tasks', nargs='*', metavar='TASK',
+                        help="Only these tasks and their dependencies; shell-style patterns "
+                             "such as 'plot:*' (default: everything)")
+    parser.add_argument('--jobs', '-j', type=int, default=os.cpu_count() or 1,
+                        help="Tasks to run at once")
+    parser.add_argument('--force', action='store_true', help="Rebuild even up-to-date tasks")
+    parser.add_argument('--list', action='store_true',
+                        help="Show the tasks and which would run, without building")
+    parser.add_argument('--root', default=SITE_ROOT, help="Site root the asset paths are under")
+    parser.add_argument('--cache-dir', default=CACHE_DIR,
+                        help="Build cache the scripts read and fill")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Don't use the scripts' build cache")
+    args = parser.parse_args(argv)
+
+    build = SiteBuild(site_tasks(args.root, None if args.no_cache else args.cache_dir), args.root)
+    try:
+        if args.list:
+            print(build.describe(args.tasks))
+            return
+        results = build.run(args.tasks, args.jobs, args.force)
+    except (ValueError, FileNotFoundError) as error:
+        parser.error(str(error))
+    print(f"\n{build.report(results, args.jobs)}")
+    failed = [name for name, (status, _) in results.items() if status == 'failed']
+    if failed:
+        raise SystemExit(f"\n{len(failed)} task(s) failed: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    main()
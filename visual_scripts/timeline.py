@@ -0,0 +1,140 @@
+import numpy as np
+
+# Easing functions map progress t in [0, 1) within a segment to the fraction
+# of the way from the start value to the end value.
+def linear(t):
+    return t
+
+def ease_in_out(t):
+    return t * t * (3 - 2 * t)
+
+def step(t):
+    """Hold the start value for the whole segment, jump at its end"""
+    return np.zeros_like(t)
+
+def second_half(t):
+    """Stay at the start value for the first half, then ease linearly"""
+    return np.clip(2 * t - 1, 0, None)
+
+def blink(t):
+    """One full sine blink: starts and ends halfway, peaks at a quarter"""
+    return 0.5 + 0.5 * np.sin(t * np.pi * 2)
+
+
+class Track:
+    """One artist property, precomputed for every frame
+
+    ``values[frame]`` is a scalar, or an array for artists that hold many
+    elements, e.g. the heights of every bar in a collection.
+    """
+
+    def __init__(self, artist, setter, values, name):
+        self.artist = artist
+        self.setter = setter
+        self.values = values
+        self.name = name
+        # changed[f] is True when frame f differs from frame f - 1
+        self.changed = np.zeros(len(values), dtype=bool)
+        differs = values[1:] != values[:-1]
+        self.changed[1:] = differs.reshape(len(differs), -1).any(axis=1) if differs.size else False
+
+    def apply(self, frame):
+        self.setter(self.artist, self.values[frame])
+
+
+class Timeline:
+    """Declarative keyframe timeline with stateless, random-access frames.
+
+    Phases are named time spans in seconds; keyframes are declared against
+    them and sampled into one NumPy array per artist property. ``apply(frame)``
+    sets every tracked property for that frame, so frames can be rendered in
+    any order, and the fps or the total duration can change without touching
+    the keyframes.
+    """
+
+    def __init__(self, phases, fps=20, duration=None):
+        self.fps = fps
+        if fps <= 0 or duration is not None and duration <= 0:
+            raise ValueError(f"fps and duration must be positive, got {fps} and {duration}")
+        length = max(end for _, end in phases.values())
+        scale = 1.0 if duration is None else duration / length
+        # Phase boundaries in frames
+        self.phases = {name: (round(start * scale * fps), round(end * scale * fps))
+                       for name, (start, end) in phases.items()}
+        self.n_frames = round(length * scale * fps)
+        if self.n_frames < 1:
+            raise ValueError(f"A {length * scale:g} s timeline at {fps} fps has no frames")
+        self.frames = np.arange(self.n_frames)
+        self.tracks = []
+
+    def start(self, phase):
+        return self.phases[phase][0]
+
+    def end(self, phase):
+        return self.phases[phase][1]
+
+    def changed_frames(self):
+        """Mask of frames that differ from the frame before; frame 0 always does
+
+        The timeline is stateless, so a frame where no track changed looks
+        exactly like the one before it and needn't be rendered again.
+        """
+        changed = np.zeros(self.n_frames, dtype=bool)
+        changed[0] = True
+        for track in self.tracks:
+            changed |= track.changed
+        return changed
+
+    def phase_of(self, frame):
+        for name, (start, end) in self.phases.items():
+            if start <= frame < end:
+                return name
+        return None
+
+    def keyframes(self, initial, *segments):
+        """Sample keyframes into a per-frame array.
+
+        Each segment is ``(phase, value)`` or ``(phase, value, ease)``: during
+        the phase the property eases from its previous value to ``value``,
+        and holds ``value`` afterwards. Values may be arrays (one entry per
+        element of a collection), giving a ``(n_frames, n)`` array.
+        """
+        initial = np.asarray(initial, dtype=float)
+        values = np.empty((self.n_frames,) + initial.shape)
+        values[:] = initial
+        previous = initial
+        for phase, value, *ease in segments:
+            ease = ease[0] if ease else linear
+            start, end = self.phases[phase]
+            inside = slice(start, end)
+            t = (self.frames[inside] - start) / max(end - start, 1)
+            progress = ease(t).reshape((-1,) + (1,) * initial.ndim)
+            values[inside] = previous + (np.asarray(value) - previous) * progress
+            values[end:] = value
+            previous = value
+        return values
+
+    def add(self, artists, setter, values):
+        """Track ``values`` on one artist or a list of artists.
+
+        ``setter`` is a method name such as ``'set_alpha'`` or a callable
+        ``setter(artist, value)``.
+        """
+        if isinstance(setter, str):
+            name = setter
+            setter = lambda artist, value: getattr(artist, name)(value)
+        else:
+            name = setter.__name__
+        if not isinstance(artists, (list, tuple)):
+            artists = [artists]
+        for artist in artists:
+            self.tracks.append(Track(artist, setter, values, name))
+
+    def apply(self, frame):
+        """Set every tracked property for ``frame``; return artists that changed"""
+        dirty = []
+        for track in self.tracks:
+            track.apply(frame)
+            if track.changed[frame]:
+                dirty.append(track.artist)
+        return dirty
@@ -0,0 +1,141 @@
+import os
+import subprocess
+
+import matplotlib
+
+
+def temporary_path(output_path):
+    """A new empty file next to ``output_path``, with the same extension
+
+    Writers fill it and ``os.replace`` it onto ``output_path`` once complete,
+    so a failed render never leaves a truncated file in its place. Unlike
+    ``tempfile.mkstemp`` (always 0600) it is created with the umask's
+    permissions, which the replaced output keeps.
+    """
+    directory, name = os.path.split(os.path.abspath(output_path))
+    while True:
+        path = os.path.join(directory, f'.{name}.{os.urandom(4).hex()}{os.path.splitext(name)[1]}')
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+        except FileExistsError:
+            continue
+        os.close(fd)
+        return path
+
+
+class RawVideoWriter:
+    """Stream raw RGBA frames straight into an ffmpeg ``rawvideo`` pipe.
+
+    Unlike matplotlib's ``FFMpegWriter`` there is no ``savefig`` per frame:
+    the caller draws the Agg canvas and passes ``canvas.buffer_rgba()``,
+    whose memoryview is written to ffmpeg's stdin without intermediate
+    encoding or copies. ffmpeg writes to a temporary file, which only
+    replaces ``output_path`` once the video is complete.
+
+    ``durations`` makes a variable frame rate video: how many ``1 / fps``
+    periods each written frame is shown for, e.g. ``[20, 1, 1]`` holds the
+    first frame for a second at 20 fps. Holds are then encoded once instead
+    of as repeated frames.
+
+    Use as a context manager::
+
+        with RawVideoWriter('out.mp4', fig.canvas.get_width_height(), crf=23) as writer:
+            fig.canvas.draw()
+            writer.write_frame(fig.canvas.buffer_rgba())
+    """
+
+    def __init__(self, output_path, size, fps=20, codec='libx264', crf=None, preset=None,
+                 pix_fmt='yuv420p', bitrate=2000, extra_args=(), durations=None):
+        self.output_path = output_path
+        self.width, self.height = size
+        self.fps = fps
+        self.codec = codec
+        self.crf = crf
+        self.preset = preset
+        self.pix_fmt = pix_fmt
+        # CRF (constant quality) takes precedence over a target bitrate
+        self.bitrate = None if crf is not None else bitrate
+        self.extra_args = list(extra_args)
+        self.durations = None if durations is None else [int(d) for d in durations]
+        self._written = 0
+        self._proc = None
+        self._tmp = None
+
+    def args(self):
+        """ffmpeg command line"""
+        args = [matplotlib.rcParams['animation.ffmpeg_path'], '-y', '-loglevel', 'error',
+                '-f', 'rawvideo', '-pix_fmt', 'rgba',
+                '-s', f'{self.width}x{self.height}', '-framerate', str(self.fps),
+                '-i', 'pipe:']
+        filters = []
+        if self.durations is not None:
+            filters.append(f"setpts='{self._pts_expression()}'")
+        if self.pix_fmt in ('yuv420p', 'yuv422p', 'nv12'):
+            # Chroma subsampling needs even dimensions
+            filters.append('crop=trunc(iw/2)*2:trunc(ih/2)*2')
+        if filters:
+            args += ['-vf', ','.join(filters)]
+        if self.durations is not None:
+            # -vsync rather than -fps_mode, which needs ffmpeg 5.1
+            args += ['-vsync', 'vfr']
+        args += ['-c:v', self.codec, '-pix_fmt', self.pix_fmt]
+        if self.crf is not None:
+            args += ['-crf', str(self.crf)]
+        if self.bitrate is not None:
+            args += ['-b:v', f'{self.bitrate}k']
+        if self.preset is not None:
+            args += ['-preset', self.preset]
+        if self.output_path.endswith(('.mp4', '.mov')):
+            # Moves metadata to the front so browsers can start playback early
+            args += ['-movflags', '+faststart']
+        return args + self.extra_args + [self._tmp or self.output_path]
+
+    def _pts_expression(self):
+        """ffmpeg expression mapping the N-th written frame to its timestamp
+
+        One term per hold: frames after a hold are shifted by its extra length.
+        """
+        terms = ['N']
+        for n, duration in enumerate(self.durations, 1):
+            if duration > 1:
+                terms.append(f'{duration - 1}*gte(N,{n})')
+        return '+'.join(terms)
+
+    def __enter__(self):
+        self._tmp = temporary_path(self.output_path)
+        try:
+            self._proc = subprocess.Popen(self.args(), stdin=subprocess.PIPE,
+                                          stderr=subprocess.PIPE)
+        except BaseException:
+            os.remove(self._tmp)
+            raise
+        return self
+
+    def write_frame(self, rgba):
+        """Write one frame: any buffer of ``height * width * 4`` RGBA bytes"""
+        self._proc.stdin.write(rgba)
+        self._written += 1
+        if self.durations is not None and self._written == len(self.durations):
+            # The muxer drops the duration of the last frame, so end on a
+            # copy at the very end of the video to give the real one its length
+            self._proc.stdin.write(rgba)
+
+    def grab(self, canvas):
+        """Write the current contents of an already drawn Agg canvas"""
+        self.write_frame(canvas.buffer_rgba())
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self._proc.stdin.close()
+        except BrokenPipeError:
+            pass
+        stderr = self._proc.stderr.read()
+        returncode = self._proc.wait()
+        if exc_type is None and not returncode:
+            os.replace(self._tmp, self.output_path)
+            return
+        # ffmpeg finishes a valid but cut-off video when its input stops early
+        os.remove(self._tmp)
+        if returncode:
+            # Surface ffmpeg's own message rather than a bare BrokenPipeError
+            raise subprocess.CalledProcessError(returncode, self.args(), stderr=stderr) from exc
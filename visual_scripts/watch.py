@@ -0,0 +1,242 @@
+"""Re-render the plots and the animation whenever their inputs change
+
+One long-lived process keeps matplotlib imported, the font resolved and
+the figures laid out, and polls the scripts, the style and any ``--tables``
+files. On a change it reloads the edited modules (and those importing
+them) and re-renders only what changed:
+
+- plots: charts whose table or drawing code changed, from the warm figure
+  pool, in well under a second;
+- animation: the frames whose content changed, previewed as one PNG (the
+  last changed frame) or, with ``--preview-frames N``, a short MP4 of the
+  first N changed frames. ``--frames A:B`` always previews that range.
+
+    python -m visual_scripts watch                 # both, into ./preview
+    python -m visual_scripts watch plots --tables results.csv
+    python -m visual_scripts watch animation --dpi 50 --preview-frames 30
+
+A script with a syntax error is reported and the last good version is kept
+until it is fixed.
+"""
+import argparse
+import importlib
+import os
+import sys
+import time
+import traceback
+
+import matplotlib
+
+# Watched scripts, dependencies before the modules that import them
+MODULES = ('build_cache', 'plot_style', 'bar_collections', 'figure_export', 'timeline',
+           'video_writer', 'animated_image', 'frame_compositor', 'frame_profiler',
+           'create_libero_plot', 'create_libero_animation')
+TARGETS = ('plots', 'animation')
+OUTPUT_DIR = 'preview'
+
+
+def parse_frames(spec):
+    """'150' -> range(150, 151), '100:140' -> range(100, 140)"""
+    start, _, stop = spec.partition(':')
+    return range(int(start), int(stop) if stop else int(start) + 1)
+
+
+class Watcher:
+    """Warm state of the watched targets, refreshed on every change.
+
+    ``refresh(changed)`` reloads what the changed files affect and
+    re-renders; the figures, the pool and the last frame keys persist
+    between calls, so a change only costs what it touches.
+    """
+
+    def __init__(self, targets, output_dir=OUTPUT_DIR, tables=None, exports=None, dpi=None,
+                 frames=None, preview_frames=1, cache_dir=None):
+        self.targets = targets
+        self.output_dir = output_dir
+        self.table_paths = [os.path.abspath(path) for path in tables or ()]
+        self.exports = exports
+        self.dpi = dpi
+        self.frames = frames
+        self.preview_frames = preview_frames
+        self.cache_dir = cache_dir
+        # Last rendered key per plot, and per animation frame
+        self.plot_keys = {}
+        self.frame_keys = None
+        self.pool = None
+        self.animation = None
+        os.makedirs(output_dir, exist_ok=True)
+        for name in MODULES:
+            importlib.import_module(name)
+
+    def watched_files(self):
+        modules = [os.path.abspath(sys.modules[name].__file__) for name in MODULES]
+        return modules + self.table_paths
+
+    def snapshot(self):
+        stamps = {}
+        for path in self.watched_files():
+            try:
+                stamps[path] = os.stat(path).st_mtime_ns
+            except FileNotFoundError:  # Mid-save: picked up on the next poll
+                stamps[path] = None
+        return stamps
+
+    def reload(self, changed):
+        """Reload the changed modules and every module after them in ``MODULES``"""
+        paths = [os.path.abspath(sys.modules[name].__file__) for name in MODULES]
+        edited = [i for i, path in enumerate(paths) if path in changed]
+        if not edited:
+            return
+        # Style edits that remove an rcParam must not leave the old value behind
+        matplotlib.rcdefaults()
+        for name in MODULES[min(edited):]:
+            importlib.reload(sys.modules[name])
+        # Laid out by the old code
+        if self.pool is not None:
+            self.pool.close()
+            self.pool = None
+        if self.animation is not None:
+            sys.modules['create_libero_animation'].plt.close(self.animation[0])
+            self.animation = None
+
+    def refresh(self, changed=()):
+        start = time.perf_counter()
+        try:
+            self.reload(changed)
+            if 'plots' in self.targets:
+                self.render_plots()
+            if 'animation' in self.targets:
+                self.render_animation()
+        except Exception:
+            traceback.print_exc()
+            print("Keeping the last good render; waiting for the next change")
+            return
+        print(f"Refreshed in {time.perf_counter() - start:.2f} s")
+
+    def tables(self):
+        plots = sys.modules['create_libero_plot']
+        if not self.table_paths:
+            return plots.default_tables()
+        return [table for path in self.table_paths for table in plots.load_tables(path)]
+
+    def render_plots(self):
+        plots = sys.modules['create_libero_plot']
+        if self.pool is None:
+            self.pool = plots.FigurePool()
+        exports = self.exports or ['png@150']
+        for table in self.tables():
+            title = table['title']
+            filename = plots.table_filename(table, 'png')
+            color = table.get('color', plots.color_with)
+            add_hatching = table.get('add_hatching', False)
+            # The build cache's keys, so the two can't disagree about a change
+            parsed = plots.parse_exports(exports, os.path.splitext(filename)[0])
+            key = [plots.plot_key(table['models'], table['scores'], color, title, add_hatching,
+                                  export, parsed) for export in parsed]
+            if self.plot_keys.get(filename) == key:
+                continue
+            plots.create_plot(table['models'], table['scores'], color, title, filename,
+                              add_hatching=add_hatching, output_dir=self.output_dir,
+                              cache_dir=self.cache_dir, pool=self.pool, exports=exports)
+            self.plot_keys[filename] = key
+
+    def render_animation(self):
+        animation = sys.modules['create_libero_animation']
+        dpi = self.dpi or animation.DPI
+        if self.animation is None:
+            self.animation = animation.build_animation(dpi=dpi)
+        fig, timeline = self.animation
+        keys = animation.frame_keys(fig, timeline, dpi)
+        previous = self.frame_keys
+        if self.frames is not None:
+            if previous == keys:
+                return
+            frames = list(self.frames)
+        else:
+            changed = [frame for frame in timeline.frames
+                       if previous is None or frame >= len(previous)
+                       or keys[frame] != previous[frame]]
+            if not changed:
+                return
+            # The first run of consecutive changed frames, e.g. the edited phase
+            end = next((i for i in range(1, len(changed)) if changed[i] != changed[i - 1] + 1),
+                       len(changed))
+            run = changed[:end]
+            frames = run[-1:] if self.preview_frames == 1 else run[:self.preview_frames]
+        phase = timeline.phase_of(frames[0]) or 'between phases'
+        if len(frames) == 1:
+            path = os.path.join(self.output_dir, f'animation_frame{frames[0]:03d}.png')
+            timeline.apply(frames[0])
+            fig.savefig(path, facecolor=fig.get_facecolor())
+            self.frame_keys = keys
+            print(f"Frame {frames[0]} ({phase}) saved: {path}")
+            return
+        path = os.path.join(self.output_dir, 'animation_preview.mp4')
+        from video_writer import RawVideoWriter
+        writer = RawVideoWriter(path, fig.canvas.get_width_height(), fps=timeline.fps, crf=23,
+                                preset='ultrafast')
+        with writer:
+            for _ in animation.render_frames(fig, timeline.apply, frames, blit=True):
+                writer.grab(fig.canvas)
+        self.frame_keys = keys
+        print(f"Frames {frames[0]}-{frames[-1]} ({phase}) saved: {path}")
+
+    def run(self, interval=0.2):
+        stamps = self.snapshot()
+        self.refresh()
+        print(f"Watching {len(stamps)} files (Ctrl-C to stop)...")
+        try:
+            while True:
+                time.sleep(interval)
+                current = self.snapshot()
+                changed = {path for path, stamp in current.items() if stamps.get(path) != stamp}
+                if changed and None not in (current[path] for path in changed):
+                    stamps = current
+                    print(f"\nChanged: {', '.join(os.path.basename(path) for path in changed)}")
+                    self.refresh(changed)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if self.pool is not None:
+                self.pool.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-render the plots and the animation "
+                                                 "whenever their code, style or data change")
+    parser.add_argument('targets', nargs='*', metavar='TARGET',
+                        help="What to keep up to date: plots, animation (default: both)")
+    parser.add_argument('--output-dir', default=OUTPUT_DIR, help="Where to write the previews")
+    parser.add_argument('--tables', nargs='+', metavar='FILE',
+                        help="Watch and render these CSV/JSON/JSONL tables instead of the "
+                             "built-in plots")
+    parser.add_argument('--export', nargs='+', metavar='SPEC',
+                        help="Plot formats, as in create_libero_plot.py (default: png@150)")
+    parser.add_argument('--dpi', type=int, help="Animation frame resolution (default: the video's)")
+    parser.add_argument('--frames', type=parse_frames, metavar='A[:B]',
+                        help="Always preview these animation frames")
+    parser.add_argument('--preview-frames', type=int, default=1, metavar='N',
+                        help="Preview up to N changed animation frames as an MP4 "
+                             "(default: 1, the last changed frame as a PNG)")
+    parser.add_argument('--interval', type=float, default=0.2, help="Polling interval in seconds")
+    parser.add_argument('--cache-dir', help="Also use this build cache (off by default: "
+                                            "previews are never stale, so it rarely helps)")
+    args = parser.parse_args(argv)
+    for target in args.targets:
+        if target not in TARGETS:
+            parser.error(f"unknown target {target!r} (choose from {', '.join(TARGETS)})")
+    if args.preview_frames < 1:
+        parser.error("--preview-frames must be at least 1")
+    if args.frames is not None:
+        from create_libero_animation import FPS, PHASES
+        from timeline import Timeline
+        n_frames = Timeline(PHASES, fps=FPS).n_frames
+        if not args.frames or args.frames.start < 0 or args.frames.stop > n_frames:
+            parser.error(f"--frames must be a non-empty range within 0-{n_frames - 1}")
+    watcher = Watcher(args.targets or TARGETS, args.output_dir, args.tables, args.export, args.dpi,
+                      args.frames, args.preview_frames, args.cache_dir)
+    watcher.run(args.interval)
+
+
+if __name__ == "__main__":
+    main()